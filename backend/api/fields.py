@@ -1,7 +1,21 @@
 import base64
+import binascii
 
-from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+from core.constants import ImageConstants
+from core.images import get_thumbnail_urls
+
+
+image_constants = ImageConstants()
+
+
+class Base64UploadedFile(TemporaryUploadedFile):
+
+    def __del__(self):
+        self.close()
 
 
 class Base64ImageField(serializers.ImageField):
@@ -9,5 +23,67 @@ class Base64ImageField(serializers.ImageField):
         if isinstance(data, str) and data.startswith('data:image'):
             format, imgstr = data.split(';base64,')
             ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
+            data = Base64UploadedFile(
+                'temp.' + ext, format[len('data:'):], 0, None
+            )
+            try:
+                self.decode_to_file(imgstr, data)
+            except (binascii.Error, ValueError):
+                data.close()
+                self.fail('invalid_image')
         return super().to_internal_value(data)
+
+    @staticmethod
+    def decode_to_file(imgstr, file):
+        remainder = ''
+        chunk_size = image_constants.BASE64_CHUNK_SIZE
+        for start in range(0, len(imgstr), chunk_size):
+            chunk = remainder + ''.join(
+                imgstr[start:start + chunk_size].split()
+            )
+            cut = len(chunk) - len(chunk) % 4
+            file.write(base64.b64decode(chunk[:cut], validate=True))
+            remainder = chunk[cut:]
+        if remainder:
+            raise ValueError('Incorrect base64 padding')
+        file.size = file.tell()
+        file.seek(0)
+
+
+class ThumbnailsField(serializers.ReadOnlyField):
+    def to_representation(self, value):
+        return get_thumbnail_urls(value, self.context.get('request'))
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        pks = []
+        for pk in data:
+            if isinstance(pk, bool):
+                child.fail('incorrect_type', data_type=type(pk).__name__)
+            try:
+                pks.append(int(pk))
+            except (TypeError, ValueError):
+                child.fail('incorrect_type', data_type=type(pk).__name__)
+        objects = child.get_queryset().in_bulk(pks)
+        for pk in pks:
+            if pk not in objects:
+                child.fail('does_not_exist', pk_value=pk)
+        return [objects[pk] for pk in pks]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
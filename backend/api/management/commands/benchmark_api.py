@@ -0,0 +1,199 @@
+import json
+import re
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Ingredient, Recipe, Tag
+
+
+User = get_user_model()
+
+COLLECTION_PATH = (
+    settings.BASE_DIR.parent
+    / 'postman_collection/foodgram.postman_collection.json'
+)
+EXPECTED_STATUS = re.compile(r'Статус-код ответа должен быть (\d{3})')
+VARIABLE = re.compile(r'{{(\w+)}}')
+EXTRA_SCENARIOS = (
+    ('recipes_feed', 'user', '/api/recipes/feed/', 200),
+    ('recipes_trending', 'anonymous', '/api/recipes/?ordering=trending', 200),
+    ('ingredients_autocomplete', 'anonymous',
+     '/api/ingredients/autocomplete/?name={{ingredientNameFirstLatter}}',
+     200),
+)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    help = 'Замер времени ответа и числа SQL-запросов основных эндпоинтов API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Сколько раз повторять каждый запрос'
+        )
+        parser.add_argument(
+            '--user',
+            type=int,
+            help='id пользователя для авторизованных запросов'
+        )
+        parser.add_argument(
+            '--collection',
+            default=COLLECTION_PATH,
+            help='Postman-коллекция, из которой берутся GET-запросы'
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для сохранения результатов в формате JSON'
+        )
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['user'])
+        token, _ = Token.objects.get_or_create(user=user)
+        host = next(
+            (host.lstrip('.') for host in settings.ALLOWED_HOSTS
+             if host not in ('', '*')),
+            'localhost'
+        )
+        clients = {
+            'anonymous': Client(HTTP_HOST=host),
+            'user': Client(
+                HTTP_HOST=host, HTTP_AUTHORIZATION=f'Token {token.key}'
+            ),
+        }
+        results = {}
+        for name, client_name, url, status in self.get_scenarios(
+            options['collection'], user
+        ):
+            results[name] = self.measure(
+                clients[client_name], url, options['iterations']
+            )
+            results[name]['expected_status'] = status
+            self.stdout.write(
+                '{name:<56} {status} p50 {p50:>8.1f} мс  '
+                'p95 {p95:>8.1f} мс  запросов {queries}'.format(
+                    name=name, **results[name]
+                )
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def get_user(user_id):
+        users = User.objects.order_by('id')
+        user = (
+            users.filter(id=user_id).first() if user_id else
+            users.filter(subscriptions__isnull=False).first() or users.first()
+        )
+        if user is None:
+            raise CommandError('В базе нет пользователей')
+        return user
+
+    def get_scenarios(self, path, user):
+        variables = self.get_variables(user)
+        scenarios, seen = [], set()
+        for name, client_name, url, status in (
+            *self.read_collection(path), *EXTRA_SCENARIOS
+        ):
+            try:
+                url = VARIABLE.sub(lambda match: variables[match[1]], url)
+            except KeyError:
+                continue
+            if (client_name, url) not in seen:
+                seen.add((client_name, url))
+                scenarios.append((name, client_name, url, status))
+        return scenarios
+
+    @classmethod
+    def read_collection(cls, path):
+        try:
+            with open(path, encoding='utf-8') as file:
+                collection = json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(
+                f'Не удалось прочитать коллекцию {path}: {error}'
+            )
+        return cls.get_requests(collection['item'], collection.get('auth'))
+
+    @classmethod
+    def get_requests(cls, items, auth):
+        for item in items:
+            item_auth = item.get('auth', auth)
+            if 'item' in item:
+                yield from cls.get_requests(item['item'], item_auth)
+                continue
+            request = item['request']
+            if request['method'] != 'GET':
+                continue
+            item_auth = request.get('auth', item_auth)
+            status = EXPECTED_STATUS.search(''.join(
+                line for event in item.get('event', ())
+                if event['listen'] == 'test'
+                for line in event['script']['exec']
+            ))
+            yield (
+                re.sub(r'\W+', '_', item['name']).strip('_').lower(),
+                'anonymous' if item_auth is None
+                or item_auth['type'] == 'noauth' else 'user',
+                re.sub(r'^{{baseUrl}}', '', request['url']['raw']),
+                int(status[1]) if status else 200
+            )
+
+    @staticmethod
+    def get_variables(user):
+        variables = {'userId': user.id}
+        tags = list(Tag.objects.order_by('id')[:3])
+        for position, tag in zip(('first', 'second', 'third'), tags):
+            variables[f'{position}TagId'] = tag.id
+            variables[f'{position}TagSlug'] = tag.slug
+        ingredient = Ingredient.objects.order_by('id').first()
+        if ingredient is not None:
+            variables['firstIndredientId'] = ingredient.id
+            variables['ingredientNameFirstLatter'] = ingredient.name[:1]
+        recipe = Recipe.objects.order_by('id').first()
+        if recipe is not None:
+            variables['firstRecipeId'] = recipe.id
+        return {key: str(value) for key, value in variables.items()}
+
+    @staticmethod
+    def measure(client, url, iterations):
+        timings = []
+        for _ in range(max(iterations, 1)):
+            with ExitStack() as stack:
+                queries = {
+                    alias: stack.enter_context(
+                        CaptureQueriesContext(connections[alias])
+                    )
+                    for alias in connections
+                }
+                started = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+        queries = {
+            alias: len(captured) for alias, captured in queries.items()
+        }
+        return {
+            'url': url,
+            'status': response.status_code,
+            'p50': percentile(timings, 0.5),
+            'p95': percentile(timings, 0.95),
+            'queries': sum(queries.values()),
+            'queries_by_alias': queries,
+        }
@@ -1,11 +1,15 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import IntegerField, Value
 from djoser.serializers import UserCreateSerializer
 from rest_framework import serializers
 
-from .fields import Base64ImageField
+from .fields import (Base64ImageField, BulkPrimaryKeyRelatedField,
+                     ThumbnailsField)
 from core.constants import UsersConstants
-from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            RecipeTag, ShoppingCart, Subscription, Tag)
+from recipes.models import (Favorite, FeedEntry, Ingredient, Recipe,
+                            RecipeIngredient, RecipeTag, ShoppingCart,
+                            ShoppingListItem, Subscription, Tag)
 
 
 User = get_user_model()
@@ -23,13 +27,17 @@ class CustomUserSerializer(UserCreateSerializer):
 
 class UserReadSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
+    avatar_thumbnails = ThumbnailsField(source='avatar')
 
     class Meta:
         model = User
         fields = ('email', 'id', 'username', 'first_name',
-                  'last_name', 'is_subscribed', 'avatar')
+                  'last_name', 'is_subscribed', 'avatar',
+                  'avatar_thumbnails')
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         if not self.context.get('request'):
             return False
         user = self.context.get('request').user
@@ -121,14 +129,18 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         many=True, source='recipe_ingredients')
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    image_thumbnails = ThumbnailsField(source='image')
 
     class Meta:
         model = Recipe
         fields = ('id', 'tags', 'author', 'ingredients',
                   'is_favorited', 'is_in_shopping_cart',
-                  'name', 'image', 'text', 'cooking_time')
+                  'name', 'image', 'image_thumbnails', 'text',
+                  'cooking_time', 'favorites_count', 'in_carts_count')
 
-    def get_method_field(self, obj, model_name):
+    def get_method_field(self, obj, model_name, annotation):
+        if hasattr(obj, annotation):
+            return getattr(obj, annotation)
         if not self.context.get('request'):
             return False
         user = self.context.get('request').user
@@ -140,10 +152,12 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         ).exists()
 
     def get_is_favorited(self, obj):
-        return self.get_method_field(obj, Favorite)
+        return self.get_method_field(obj, Favorite, 'is_favorited')
 
     def get_is_in_shopping_cart(self, obj):
-        return self.get_method_field(obj, ShoppingCart)
+        return self.get_method_field(
+            obj, ShoppingCart, 'is_in_shopping_cart'
+        )
 
 
 class RecipeSerializer(serializers.ModelSerializer):
@@ -154,7 +168,7 @@ class RecipeSerializer(serializers.ModelSerializer):
     ingredients = IngredientCreateRecipeSerializer(
         many=True
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = BulkPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all()
     )
@@ -173,6 +187,7 @@ class RecipeSerializer(serializers.ModelSerializer):
             ) for ingredient in ingredients]
         )
 
+    @transaction.atomic
     def create(self, validated_data):
 
         tags = validated_data.pop('tags', [])
@@ -181,17 +196,82 @@ class RecipeSerializer(serializers.ModelSerializer):
             author=self.context['request'].user,
             ** validated_data)
         self.add_tags_and_ingredients(recipe, tags, ingredients)
+        FeedEntry.objects.fan_out(recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags = validated_data.pop('tags', [])
         ingredients = validated_data.pop('ingredients', [])
-        RecipeTag.objects.filter(recipe=instance).delete()
-        RecipeIngredient.objects.filter(recipe=instance).delete()
         super().update(instance, validated_data)
-        self.add_tags_and_ingredients(instance, tags, ingredients)
+        self.update_tags(instance, tags)
+        delta = self.update_ingredients(instance, ingredients)
+        if delta:
+            ShoppingListItem.objects.apply_delta(
+                list(instance.shoppingcarts.values_list(
+                    'user_id', flat=True
+                )),
+                delta
+            )
         return instance
 
+    @staticmethod
+    def update_tags(recipe, tags):
+        old_tag_ids = set(
+            RecipeTag.objects.filter(recipe=recipe).values_list(
+                'tag_id', flat=True
+            )
+        )
+        new_tag_ids = {tag.id for tag in tags}
+        if old_tag_ids - new_tag_ids:
+            RecipeTag.objects.filter(
+                recipe=recipe, tag_id__in=old_tag_ids - new_tag_ids
+            ).delete()
+        if new_tag_ids - old_tag_ids:
+            RecipeTag.objects.bulk_create(
+                RecipeTag(recipe=recipe, tag_id=tag_id)
+                for tag_id in new_tag_ids - old_tag_ids
+            )
+
+    def update_ingredients(self, recipe, ingredients):
+        current = self.current_ingredients
+        amounts = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredients
+        }
+        removed = [
+            row_id for ingredient_id, (row_id, _) in current.items()
+            if ingredient_id not in amounts
+        ]
+        changed = [
+            RecipeIngredient(pk=current[ingredient_id][0], amount=amount)
+            for ingredient_id, amount in amounts.items()
+            if ingredient_id in current
+            and current[ingredient_id][1] != amount
+        ]
+        if removed:
+            RecipeIngredient.objects.filter(pk__in=removed).delete()
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ['amount'])
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe, ingredient_id=ingredient_id, amount=amount
+            )
+            for ingredient_id, amount in amounts.items()
+            if ingredient_id not in current
+        )
+        delta = {
+            ingredient_id: amount - current.get(ingredient_id, (None, 0))[1]
+            for ingredient_id, amount in amounts.items()
+        }
+        for ingredient_id, (_, amount) in current.items():
+            if ingredient_id not in amounts:
+                delta[ingredient_id] = -amount
+        return {
+            ingredient_id: amount
+            for ingredient_id, amount in delta.items() if amount
+        }
+
     def validate(self, data):
         ingredients = data.get('ingredients')
         tags = data.get('tags')
@@ -222,15 +302,42 @@ class RecipeSerializer(serializers.ModelSerializer):
                 'Некорректное количество ингредиента!'
             )
 
-        ids = [ingredient['id'] for ingredient in ingredients]
-        if Ingredient.objects.filter(id__in=ids).count() != len(ids):
+        ids = {ingredient['id'] for ingredient in ingredients}
+        existing_ids, self.current_ingredients = self.get_ingredient_rows(ids)
+        if not ids <= existing_ids:
             raise serializers.ValidationError(
                 'Рецепт с несуществующим ингредиентом!'
             )
         return data
 
+    def get_ingredient_rows(self, ids):
+        if self.instance is None:
+            return set(Ingredient.objects.filter(
+                id__in=ids
+            ).values_list('id', flat=True)), {}
+        rows = Ingredient.objects.filter(id__in=ids).values_list(
+            'id',
+            Value(None, output_field=IntegerField()),
+            Value(None, output_field=IntegerField())
+        ).union(
+            RecipeIngredient.objects.filter(recipe=self.instance).values_list(
+                'ingredient_id', 'id', 'amount'
+            ),
+            all=True
+        )
+        existing_ids = set()
+        current = {}
+        for ingredient_id, row_id, amount in rows:
+            existing_ids.add(ingredient_id)
+            if row_id is not None:
+                current[ingredient_id] = (row_id, amount)
+        return existing_ids, current
+
     def to_representation(self, instance):
-        return RecipeReadSerializer(instance).data
+        recipe = Recipe.objects.for_read(
+            self.context['request'].user
+        ).get(pk=instance.pk)
+        return RecipeReadSerializer(recipe, context=self.context).data
 
     class Meta:
         model = Recipe
@@ -238,71 +345,46 @@ class RecipeSerializer(serializers.ModelSerializer):
 
 
 class FavoriteReadSerializer(serializers.ModelSerializer):
+    image_thumbnails = ThumbnailsField(source='image')
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
-
-
-class RecipeFavoriteSerializer(serializers.ModelSerializer):
-
-    class Meta:
-        model = Favorite
-        fields = '__all__'
-
-    def to_representation(self, instance):
-        return FavoriteReadSerializer(instance.recipe).data
+        fields = ('id', 'name', 'image', 'image_thumbnails', 'cooking_time')
 
 
 class ShoppingCartReadSerializer(serializers.ModelSerializer):
+    image_thumbnails = ThumbnailsField(source='image')
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_thumbnails', 'cooking_time')
 
 
-class ShoppingCartSerializer(serializers.ModelSerializer):
-
-    class Meta:
-        model = ShoppingCart
-        fields = '__all__'
-
-    def to_representation(self, instance):
-        return ShoppingCartReadSerializer(instance.recipe).data
+def get_recipes_limit(request):
+    try:
+        recipes_limit = int(request.query_params.get('recipes_limit'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return recipes_limit if recipes_limit >= 0 else None
 
 
 class UserSubscriptionReadSerializer(UserReadSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
 
     class Meta(UserReadSerializer.Meta):
         fields = UserReadSerializer.Meta.fields + ('recipes',
                                                    'recipes_count',
+                                                   'subscribers_count',
                                                    )
 
     def get_recipes(self, obj):
-        recipes = Recipe.objects.values(
-            'id', 'name', 'image', 'cooking_time'
-        ).filter(author=obj)
-
-        try:
-            recipes_limit = self.context.get(
-                'request').query_params.get('recipes_limit')
-            return recipes[:int(recipes_limit)]
-        except Exception:
-            return recipes
-
-    def get_recipes_count(self, obj):
-        return self.get_recipes(obj).count()
-
-
-class UserSubscriptionSerializer(serializers.ModelSerializer):
-
-    class Meta:
-        model = Subscription
-        fields = '__all__'
-
-    def to_representation(self, instance):
-        return UserSubscriptionReadSerializer(
-            instance.subscription,
-            context={'request': self.context.get('request')}).data
+        if hasattr(obj, 'limited_recipes'):
+            recipes = obj.limited_recipes
+        else:
+            recipes = obj.recipes.order_by('-id')
+            recipes_limit = get_recipes_limit(self.context.get('request'))
+            if recipes_limit is not None:
+                recipes = recipes[:recipes_limit]
+        return FavoriteReadSerializer(
+            recipes, many=True, context=self.context
+        ).data
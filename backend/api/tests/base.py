@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+
+from recipes.models import Recipe, RecipeIngredient, RecipeTag
+
+
+User = get_user_model()
+
+IMAGE = (
+    'data:image/gif;base64,'
+    'R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7'
+)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class FoodgramAPITestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    @staticmethod
+    def create_user(username, **fields):
+        return User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            first_name='Имя',
+            last_name='Фамилия',
+            password='pass12345!',
+            **fields
+        )
+
+    @staticmethod
+    def create_recipe(author, name='Рецепт', tags=(), ingredients=None,
+                      **fields):
+        recipe = Recipe.objects.create(
+            author=author,
+            name=name,
+            image='recipes/images/test.png',
+            text=fields.pop('text', 'Описание'),
+            cooking_time=fields.pop('cooking_time', 10),
+            **fields
+        )
+        RecipeTag.objects.bulk_create(
+            RecipeTag(recipe=recipe, tag=tag) for tag in tags
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe, ingredient=ingredient, amount=amount
+            )
+            for ingredient, amount in (ingredients or {}).items()
+        )
+        return recipe
+
+    @staticmethod
+    def get_client(user):
+        token, _ = Token.objects.get_or_create(user=user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
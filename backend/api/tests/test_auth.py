@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.authentication import get_token_version
+from .base import FoodgramAPITestCase
+
+
+class CachedTokenAuthenticationTests(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('user')
+
+    def login(self):
+        response = self.client.post(
+            '/api/auth/token/login/',
+            {'email': self.user.email, 'password': 'pass12345!'}
+        )
+        self.assertEqual(response.status_code, 200)
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Token {response.json()["auth_token"]}'
+        )
+        return client
+
+    def assert_cached(self, client):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(client.get('/api/users/me/').status_code, 200)
+        self.assertFalse(any(
+            Token._meta.db_table in query['sql'] for query in queries
+        ))
+
+    def test_logout_revokes_cached_token(self):
+        client = self.login()
+        self.assertEqual(client.get('/api/users/me/').status_code, 200)
+        self.assert_cached(client)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(
+                client.post('/api/auth/token/logout/').status_code, 204
+            )
+        self.assertEqual(client.get('/api/users/me/').status_code, 401)
+
+    def test_other_users_stay_cached(self):
+        client = self.login()
+        client.get('/api/users/me/')
+        other = self.create_user('other')
+        with self.captureOnCommitCallbacks(execute=True):
+            other.first_name = 'Другое'
+            other.save()
+        self.assert_cached(client)
+
+    def test_logout_during_lookup_is_not_cached(self):
+        client = self.login()
+        authenticate = TokenAuthentication.authenticate_credentials
+
+        def logout_after_lookup(self, key):
+            credentials = authenticate(self, key)
+            Token.objects.filter(key=key).delete()
+            get_token_version(credentials[0].pk).bump()
+            return credentials
+
+        with mock.patch.object(
+            TokenAuthentication,
+            'authenticate_credentials',
+            logout_after_lookup
+        ):
+            self.assertEqual(client.get('/api/users/me/').status_code, 200)
+        self.assertEqual(client.get('/api/users/me/').status_code, 401)
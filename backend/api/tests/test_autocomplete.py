@@ -0,0 +1,61 @@
+from unittest import mock
+
+from core.constants import RecipesConstants
+from recipes.models import Ingredient
+from .base import FoodgramAPITestCase
+
+
+class IngredientAutocompleteTests(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        for name, measurement_unit in (
+            ('соль морская', 'г'),
+            ('солод', 'г'),
+            ('соль', 'г'),
+            ('морская капуста', 'г'),
+            ('сода', 'г'),
+            ('масло', 'мл'),
+        ):
+            Ingredient.objects.create(
+                name=name, measurement_unit=measurement_unit
+            )
+
+    def autocomplete(self, query, **params):
+        response = self.client.get(
+            '/api/ingredients/autocomplete/',
+            {'name': query, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [ingredient['name'] for ingredient in response.json()]
+
+    def test_prefix_matches_come_first(self):
+        self.assertEqual(
+            self.autocomplete('сол'), ['соль', 'солод', 'соль морская']
+        )
+        self.assertEqual(
+            self.autocomplete('МОРСКАЯ'), ['морская капуста', 'соль морская']
+        )
+        self.assertEqual(self.autocomplete('капусты'), ['морская капуста'])
+        self.assertEqual(self.autocomplete('перец'), [])
+
+    @mock.patch.object(RecipesConstants, 'INGREDIENT_AUTOCOMPLETE_LIMIT', 2)
+    @mock.patch.object(
+        RecipesConstants, 'INGREDIENT_AUTOCOMPLETE_MAX_LIMIT', 3
+    )
+    def test_limits(self):
+        self.assertEqual(len(self.autocomplete('со')), 2)
+        self.assertEqual(len(self.autocomplete('со', limit='abc')), 2)
+        self.assertEqual(self.autocomplete('со', limit=1), ['сода'])
+        self.assertEqual(len(self.autocomplete('со', limit=100)), 3)
+        self.assertEqual(self.autocomplete('со', limit=0), [])
+        self.assertEqual(self.autocomplete('  '), [])
+
+    def test_fallback_index_is_reset_on_changes(self):
+        self.autocomplete('сол')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.autocomplete('сол')[0], 'соль')
+        Ingredient.objects.create(name='сол', measurement_unit='г')
+        self.assertEqual(self.autocomplete('сол')[0], 'сол')
+        Ingredient.objects.filter(name='сол').delete()
+        self.assertEqual(self.autocomplete('сол')[0], 'соль')
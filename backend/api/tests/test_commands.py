@@ -0,0 +1,97 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.db.models import F
+
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Subscription)
+from .base import FoodgramAPITestCase
+
+
+User = get_user_model()
+
+
+class SeedAndBenchmarkTests(FoodgramAPITestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        super().setUp()
+        call_command(
+            'seed_data',
+            users=20,
+            recipes=60,
+            tags=3,
+            ingredients=30,
+            favorites=5,
+            carts=2,
+            subscriptions=3,
+            stdout=StringIO()
+        )
+
+    def test_seed_data(self):
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Recipe.objects.count(), 60)
+        self.assertFalse(
+            Recipe.objects.filter(recipe_ingredients__isnull=True).exists()
+        )
+        self.assertGreater(RecipeIngredient.objects.count(), 60)
+        self.assertTrue(Favorite.objects.exists())
+        self.assertTrue(ShoppingCart.objects.exists())
+        self.assertFalse(Subscription.objects.filter(
+            user=F('subscription')
+        ).exists())
+        output = StringIO()
+        call_command('reconcile_counters', check=True, stdout=output)
+        self.assertNotRegex(output.getvalue(), r'расхождений [1-9]')
+
+    def test_benchmark_api(self):
+        with tempfile.NamedTemporaryFile(suffix='.json') as file:
+            call_command(
+                'benchmark_api',
+                iterations=2,
+                output=file.name,
+                stdout=StringIO()
+            )
+            results = json.load(file)
+        self.assertLessEqual({
+            'get_recipes_list_no_auth',
+            'get_recipes_list_with_two_tags_param_user',
+            'users_me_no_auth',
+            'get_non_existing_tag_user',
+            'recipes_feed',
+        }, set(results))
+        self.assertEqual(results['users_me_no_auth']['status'], 401)
+        for name, result in results.items():
+            self.assertEqual(
+                result['status'], result['expected_status'], name
+            )
+            self.assertLessEqual(result['p50'], result['p95'], name)
+            self.assertEqual(
+                set(result['queries_by_alias']), set(connections), name
+            )
+            self.assertEqual(
+                result['queries'], sum(result['queries_by_alias'].values()),
+                name
+            )
+
+
+class LoadIngredientsTests(FoodgramAPITestCase):
+
+    def load(self, *args):
+        output = StringIO()
+        call_command('load_ingredients', *args, stdout=output)
+        return output.getvalue()
+
+    def test_repeated_load_adds_nothing(self):
+        self.assertRegex(self.load(), r'добавлено: [1-9]')
+        count = Ingredient.objects.count()
+        self.assertIn('добавлено: 0,', self.load())
+        self.assertIn('добавлено: 0,', self.load(
+            str(settings.BASE_DIR / 'data/ingredients.json')
+        ))
+        self.assertEqual(Ingredient.objects.count(), count)
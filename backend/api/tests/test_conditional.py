@@ -0,0 +1,86 @@
+from recipes.models import Ingredient, Tag
+from .base import FoodgramAPITestCase
+
+
+class RecipeConditionalGetTests(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.recipe = self.create_recipe(self.author)
+
+    def get_etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_list_revalidates_without_queries(self):
+        etag = self.get_etag('/api/recipes/')
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                '/api/recipes/', HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_etag_follows_recipe_writes_only(self):
+        etag = self.get_etag('/api/recipes/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_user('newcomer')
+        self.assertEqual(self.get_etag('/api/recipes/'), etag)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.name = 'Новое название'
+            self.recipe.save(update_fields=('name', 'updated_at'))
+        self.assertNotEqual(self.get_etag('/api/recipes/'), etag)
+
+    def test_detail_etag_follows_author_profile(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        etag = self.get_etag(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_user('newcomer').save()
+        self.assertEqual(self.get_etag(url), etag)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.first_name = 'Другое'
+            self.author.save()
+        self.assertNotEqual(self.get_etag(url), etag)
+
+
+class CatalogueConditionalGetTests(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+        self.ingredient = Ingredient.objects.create(
+            name='Мука', measurement_unit='г'
+        )
+
+    def get_response(self, url, **headers):
+        response = self.client.get(url, **headers)
+        self.assertIn(response.status_code, (200, 304))
+        return response
+
+    def test_catalogues_revalidate(self):
+        for url in ('/api/tags/', '/api/ingredients/'):
+            with self.subTest(url=url):
+                etag = self.get_response(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.get_response(
+                        url, HTTP_IF_NONE_MATCH=etag
+                    )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+    def test_catalogues_are_invalidated_after_commit(self):
+        for url, instance, field in (
+            ('/api/tags/', self.tag, 'name'),
+            ('/api/ingredients/', self.ingredient, 'name'),
+        ):
+            with self.subTest(url=url):
+                etag = self.get_response(url)['ETag']
+                with self.captureOnCommitCallbacks(execute=True):
+                    setattr(instance, field, 'Изменено')
+                    instance.save()
+                    self.assertEqual(self.get_response(url)['ETag'], etag)
+                response = self.get_response(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+                self.assertEqual(response.json()[0][field], 'Изменено')
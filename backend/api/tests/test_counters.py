@@ -0,0 +1,138 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+
+from core.pagination import KeysetPagination
+from recipes.models import Favorite, Recipe
+from .base import FoodgramAPITestCase
+
+
+class CounterTests(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.readers = [
+            self.create_user(f'reader{number}') for number in range(3)
+        ]
+        self.recipes = [
+            self.create_recipe(self.author, name=f'Рецепт {number}')
+            for number in range(5)
+        ]
+        self.clients = [self.get_client(reader) for reader in self.readers]
+        for position, recipe in enumerate(self.recipes[:3]):
+            for client in self.clients[:position + 1]:
+                client.post(f'/api/recipes/{recipe.pk}/favorite/')
+
+    def test_counters_follow_relations(self):
+        client = self.clients[0]
+        recipe = self.recipes[3]
+        client.post(f'/api/recipes/{recipe.pk}/shopping_cart/')
+        client.post(f'/api/users/{self.author.pk}/subscribe/')
+        recipe.refresh_from_db()
+        self.author.refresh_from_db()
+        self.assertEqual(recipe.in_carts_count, 1)
+        self.assertEqual(self.author.subscribers_count, 1)
+        self.assertEqual(self.author.recipes_count, 5)
+        client.delete(f'/api/recipes/{recipe.pk}/shopping_cart/')
+        client.delete(f'/api/users/{self.author.pk}/subscribe/')
+        client.delete(f'/api/users/{self.author.pk}/subscribe/')
+        recipe.refresh_from_db()
+        self.author.refresh_from_db()
+        self.assertEqual(recipe.in_carts_count, 0)
+        self.assertEqual(self.author.subscribers_count, 0)
+        self.assertEqual(
+            [recipe['favorites_count'] for recipe in self.client.get(
+                '/api/recipes/?ordering=-favorites_count'
+            ).json()['results']],
+            [3, 2, 1, 0, 0]
+        )
+
+    def test_full_save_keeps_counters(self):
+        recipe = Recipe.objects.get(pk=self.recipes[0].pk)
+        self.clients[1].post(f'/api/recipes/{recipe.pk}/favorite/')
+        recipe.name = 'Новое название'
+        recipe.save()
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.name, 'Новое название')
+        self.assertEqual(recipe.favorites_count, 2)
+
+    def walk(self, url, link='next'):
+        received = []
+        while url:
+            data = self.client.get(url).json()
+            page = [recipe['id'] for recipe in data['results']]
+            received += page if link == 'next' else page[::-1]
+            url = data[link]
+        return received
+
+    def test_cursor_pagination_keeps_ordering(self):
+        for ordering in ('-favorites_count', 'favorites_count'):
+            expected = [
+                recipe['id'] for recipe in self.client.get(
+                    f'/api/recipes/?ordering={ordering}'
+                ).json()['results']
+            ]
+            self.assertEqual(self.walk(
+                f'/api/recipes/?ordering={ordering}'
+                '&pagination=cursor&limit=1'
+            ), expected, ordering)
+
+    @mock.patch.object(KeysetPagination, 'offset_cutoff', 3)
+    def test_cursor_pagination_walks_large_ties(self):
+        for number in range(8):
+            self.create_recipe(self.author, name=f'Без лайков {number}')
+        for ordering in ('-favorites_count', 'favorites_count'):
+            expected = [
+                recipe['id'] for recipe in self.client.get(
+                    f'/api/recipes/?ordering={ordering}&limit=100'
+                ).json()['results']
+            ]
+            forward = self.walk(
+                f'/api/recipes/?ordering={ordering}'
+                '&pagination=cursor&limit=2'
+            )
+            self.assertEqual(forward, expected, ordering)
+            last_page = self.client.get(
+                f'/api/recipes/?ordering={ordering}&pagination=cursor'
+                '&limit=2'
+            ).json()
+            while last_page['next']:
+                last_page = self.client.get(last_page['next']).json()
+            backward = [
+                recipe['id'] for recipe in last_page['results']
+            ][::-1] + self.walk(last_page['previous'], 'previous')
+            self.assertEqual(backward, expected[::-1], ordering)
+
+    def test_user_delete_releases_counters(self):
+        client = self.clients[0]
+        client.post(f'/api/recipes/{self.recipes[3].pk}/shopping_cart/')
+        client.post(f'/api/users/{self.author.pk}/subscribe/')
+        self.readers[0].delete()
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.subscribers_count, 0)
+        counters = list(Recipe.objects.order_by('pk').values_list(
+            'favorites_count', 'in_carts_count'
+        ))
+        self.assertEqual(
+            counters, [(0, 0), (1, 0), (2, 0), (0, 0), (0, 0)]
+        )
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertEqual(list(Recipe.objects.order_by('pk').values_list(
+            'favorites_count', 'in_carts_count'
+        )), counters)
+
+    def test_reconcile_counters(self):
+        Favorite.objects.filter(recipe=self.recipes[2]).delete()
+        Recipe.objects.filter(pk=self.recipes[0].pk).update(
+            favorites_count=10
+        )
+        output = StringIO()
+        call_command('reconcile_counters', stdout=output)
+        self.assertEqual(
+            list(Recipe.objects.order_by('pk').values_list(
+                'favorites_count', flat=True
+            )),
+            [1, 2, 0, 0, 0]
+        )
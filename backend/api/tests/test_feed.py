@@ -0,0 +1,154 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.constants import RecipesConstants
+from recipes.models import FeedEntry, Ingredient, Recipe, Tag
+from .base import IMAGE, FoodgramAPITestCase
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class FeedTests(FoodgramAPITestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        super().setUp()
+        self.tag = Tag.objects.create(name='Обед', slug='lunch')
+        self.ingredient = Ingredient.objects.create(
+            name='Мука', measurement_unit='г'
+        )
+        self.reader = self.create_user('reader')
+        self.other_reader = self.create_user('other')
+        self.authors = [
+            self.create_user(f'author{number}') for number in range(3)
+        ]
+        for number in range(9):
+            self.create_recipe(
+                self.authors[number % 3], name=f'Рецепт {number}'
+            )
+        self.create_recipe(self.create_user('stranger'), name='Чужой')
+        self.reader_client = self.get_client(self.reader)
+        for author in self.authors:
+            self.reader_client.post(f'/api/users/{author.pk}/subscribe/')
+
+    def publish(self, author, name):
+        response = self.get_client(author).post(
+            '/api/recipes/',
+            {
+                'name': name,
+                'text': 'Описание',
+                'cooking_time': 10,
+                'image': IMAGE,
+                'tags': [self.tag.pk],
+                'ingredients': [{'id': self.ingredient.pk, 'amount': 100}],
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def get_expected(self):
+        return list(Recipe.objects.filter(
+            author__in=self.authors
+        ).order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def read_feed(self, limit=2):
+        received = []
+        url = f'/api/recipes/feed/?limit={limit}'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.reader_client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(any(
+                query['sql'].lstrip().upper().startswith('DELETE')
+                for query in queries
+            ))
+            data = response.json()
+            self.assertIsNone(data['previous'])
+            received += [recipe['id'] for recipe in data['results']]
+            url = data['next']
+        return received
+
+    def test_feed_pages(self):
+        self.assertEqual(self.read_feed(), self.get_expected())
+        self.assertEqual(
+            self.reader_client.get(
+                '/api/recipes/feed/?count=1'
+            ).json()['count'],
+            9
+        )
+        self.assertEqual(
+            self.client.get('/api/recipes/feed/').status_code, 401
+        )
+
+    def test_new_recipe_is_fanned_out(self):
+        recipe_id = self.publish(self.authors[0], 'Новый')
+        self.assertEqual(self.read_feed()[0], recipe_id)
+        self.assertEqual(
+            self.get_client(self.other_reader).get(
+                '/api/recipes/feed/'
+            ).json()['results'],
+            []
+        )
+        self.reader_client.delete(
+            f'/api/users/{self.authors[0].pk}/subscribe/'
+        )
+        self.assertNotIn(recipe_id, self.read_feed())
+
+    @mock.patch.object(RecipesConstants, 'FEED_MAX_LENGTH', 4)
+    def test_feed_is_capped_on_write(self):
+        for number in range(3):
+            self.publish(self.authors[number], f'Новый {number}')
+            self.assertLessEqual(
+                FeedEntry.objects.filter(user=self.reader).count(), 4
+            )
+        self.assertEqual(self.read_feed(), self.get_expected()[:4])
+
+    @mock.patch.object(RecipesConstants, 'FEED_FANOUT_MAX_SUBSCRIBERS', 2)
+    def test_high_fanout_authors(self):
+        author = self.authors[0]
+        self.get_client(self.other_reader).post(
+            f'/api/users/{author.pk}/subscribe/'
+        )
+        recipe = self.publish(author, 'Популярный')
+        self.assertFalse(FeedEntry.objects.filter(recipe=recipe).exists())
+        self.assertEqual(self.read_feed(), self.get_expected())
+
+        self.get_client(self.other_reader).delete(
+            f'/api/users/{author.pk}/subscribe/'
+        )
+        self.assertTrue(FeedEntry.objects.filter(
+            user=self.reader, recipe=recipe
+        ).exists())
+        self.assertEqual(self.read_feed(), self.get_expected())
+
+    @mock.patch.object(RecipesConstants, 'FEED_FANOUT_MAX_SUBSCRIBERS', 2)
+    def test_subscriber_delete_restores_fanout(self):
+        author = self.authors[0]
+        self.get_client(self.other_reader).post(
+            f'/api/users/{author.pk}/subscribe/'
+        )
+        recipe = self.publish(author, 'Популярный')
+        self.assertFalse(FeedEntry.objects.filter(recipe=recipe).exists())
+
+        self.other_reader.delete()
+        author.refresh_from_db()
+        self.assertEqual(author.subscribers_count, 1)
+        self.assertEqual(
+            list(FeedEntry.objects.filter(recipe=recipe).values_list(
+                'user_id', flat=True
+            )),
+            [self.reader.pk]
+        )
+        self.assertEqual(self.read_feed(), self.get_expected())
@@ -0,0 +1,72 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from recipes.models import Ingredient, Tag
+from .base import IMAGE, FoodgramAPITestCase
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ThumbnailTests(FoodgramAPITestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        super().setUp()
+        response = self.get_client(self.create_user('author')).post(
+            '/api/recipes/',
+            {
+                'name': 'Блины',
+                'text': 'Описание',
+                'cooking_time': 10,
+                'image': IMAGE,
+                'tags': [Tag.objects.create(name='Обед', slug='lunch').pk],
+                'ingredients': [{
+                    'id': Ingredient.objects.create(
+                        name='Мука', measurement_unit='г'
+                    ).pk,
+                    'amount': 100
+                }],
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.url = f'/api/recipes/{response.json()["id"]}/'
+
+    def test_original_is_used_until_thumbnails_exist(self):
+        response = self.client.get(self.url)
+        recipe = response.json()
+        self.assertEqual(
+            set(recipe['image_thumbnails'].values()), {recipe['image']}
+        )
+        self.assertEqual(
+            self.client.get('/api/recipes/').json()['results'][0][
+                'image_thumbnails'
+            ],
+            recipe['image_thumbnails']
+        )
+
+        call_command('generate_thumbnails', stdout=StringIO())
+        processed = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(processed.status_code, 200)
+        thumbnails = processed.json()['image_thumbnails']
+        self.assertNotIn(recipe['image'], thumbnails.values())
+        for width, url in thumbnails.items():
+            self.assertTrue(url.endswith(f'_{width}.webp'), url)
+            self.assertEqual(
+                self.client.get('/api/recipes/').json()['results'][0][
+                    'image_thumbnails'
+                ][width],
+                url
+            )
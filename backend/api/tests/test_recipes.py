@@ -0,0 +1,251 @@
+import json
+
+from recipes.models import (Favorite, Ingredient, ShoppingCart,
+                            ShoppingListItem, Subscription, Tag)
+from .base import FoodgramAPITestCase
+
+
+class RecipeListQueriesTests(FoodgramAPITestCase):
+    ANONYMOUS_QUERIES = 5
+    AUTHENTICATED_QUERIES = 5
+
+    def setUp(self):
+        super().setUp()
+        self.reader = self.create_user('reader')
+        tags = [
+            Tag.objects.create(name=f'Тег {number}', slug=f'tag{number}')
+            for number in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {number}', measurement_unit='г'
+            )
+            for number in range(4)
+        ]
+        for author_number in range(3):
+            author = self.create_user(f'author{author_number}')
+            for number in range(4):
+                recipe = self.create_recipe(
+                    author,
+                    name=f'Рецепт {author_number}-{number}',
+                    tags=tags[:number + 1],
+                    ingredients=dict.fromkeys(ingredients[number:], 10)
+                )
+                if number % 2:
+                    Favorite.objects.create(user=self.reader, recipe=recipe)
+                else:
+                    ShoppingCart.objects.create(
+                        user=self.reader, recipe=recipe
+                    )
+            Subscription.objects.create(user=self.reader, subscription=author)
+
+    def assert_list_queries(self, client, queries):
+        for limit in (2, 10):
+            with self.assertNumQueries(queries):
+                response = client.get(f'/api/recipes/?limit={limit}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['results']), limit)
+
+    def test_anonymous_list_queries_do_not_depend_on_limit(self):
+        self.assert_list_queries(self.client, self.ANONYMOUS_QUERIES)
+
+    def test_authenticated_list_queries_do_not_depend_on_limit(self):
+        client = self.get_client(self.reader)
+        client.get('/api/users/me/')
+        self.assert_list_queries(client, self.AUTHENTICATED_QUERIES)
+
+    def test_authenticated_list_flags(self):
+        results = self.get_client(self.reader).get(
+            '/api/recipes/?limit=12'
+        ).json()['results']
+        self.assertEqual(
+            sum(recipe['is_favorited'] for recipe in results), 6
+        )
+        self.assertEqual(
+            sum(recipe['is_in_shopping_cart'] for recipe in results), 6
+        )
+        self.assertTrue(all(
+            recipe['author']['is_subscribed'] for recipe in results
+        ))
+
+
+class RelationToggleTests(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('user')
+        self.author = self.create_user('author')
+        self.recipe = self.create_recipe(self.author)
+        self.user_client = self.get_client(self.user)
+
+    def assert_toggle(self, url, missing_url):
+        client = self.user_client
+        self.assertEqual(client.post(url).status_code, 201)
+        self.assertEqual(client.post(url).status_code, 400)
+        self.assertEqual(client.delete(url).status_code, 204)
+        self.assertEqual(client.delete(url).status_code, 400)
+        self.assertEqual(client.post(missing_url).status_code, 404)
+        self.assertEqual(client.delete(missing_url).status_code, 404)
+        self.assertEqual(self.client.post(url).status_code, 401)
+
+    def test_favorite(self):
+        self.assert_toggle(
+            f'/api/recipes/{self.recipe.pk}/favorite/',
+            f'/api/recipes/{self.recipe.pk + 1}/favorite/'
+        )
+
+    def test_shopping_cart(self):
+        self.assert_toggle(
+            f'/api/recipes/{self.recipe.pk}/shopping_cart/',
+            f'/api/recipes/{self.recipe.pk + 1}/shopping_cart/'
+        )
+
+    def test_subscribe(self):
+        self.assert_toggle(
+            f'/api/users/{self.author.pk}/subscribe/',
+            f'/api/users/{self.author.pk + 1}/subscribe/'
+        )
+        self.assertEqual(
+            self.user_client.post(
+                f'/api/users/{self.user.pk}/subscribe/'
+            ).status_code,
+            400
+        )
+
+
+class ShoppingListTests(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.buyer = self.create_user('buyer')
+        self.tag = Tag.objects.create(name='Обед', slug='lunch')
+        self.flour, self.milk, self.eggs = (
+            Ingredient.objects.create(name=name, measurement_unit=unit)
+            for name, unit in (('мука', 'г'), ('молоко', 'мл'), ('яйца', 'шт'))
+        )
+        self.recipe = self.create_recipe(
+            self.author,
+            tags=(self.tag,),
+            ingredients={self.flour: 200, self.milk: 300}
+        )
+        self.other = self.create_recipe(
+            self.author,
+            tags=(self.tag,),
+            ingredients={self.flour: 100}
+        )
+        self.buyer_client = self.get_client(self.buyer)
+        for recipe in (self.recipe, self.other):
+            self.buyer_client.post(f'/api/recipes/{recipe.pk}/shopping_cart/')
+
+    def get_shopping_list(self):
+        return dict(ShoppingListItem.objects.filter(
+            user=self.buyer
+        ).values_list('ingredient__name', 'total_amount'))
+
+    def test_add_and_remove(self):
+        self.assertEqual(
+            self.get_shopping_list(), {'мука': 300, 'молоко': 300}
+        )
+        self.buyer_client.delete(
+            f'/api/recipes/{self.recipe.pk}/shopping_cart/'
+        )
+        self.assertEqual(self.get_shopping_list(), {'мука': 100})
+
+    def test_recipe_edit_applies_delta(self):
+        response = self.get_client(self.author).patch(
+            f'/api/recipes/{self.recipe.pk}/',
+            {
+                'tags': [self.tag.pk],
+                'ingredients': [
+                    {'id': self.flour.pk, 'amount': 250},
+                    {'id': self.eggs.pk, 'amount': 2}
+                ]
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.get_shopping_list(), {'мука': 350, 'яйца': 2}
+        )
+        response = self.buyer_client.get(
+            '/api/recipes/download_shopping_cart/',
+            HTTP_ACCEPT='application/json'
+        )
+        self.assertEqual(
+            {
+                item['name']: item['total_amount']
+                for item in json.loads(b''.join(response.streaming_content))
+            },
+            {'мука': 350, 'яйца': 2}
+        )
+
+    def test_recipe_delete_outside_api(self):
+        self.recipe.delete()
+        self.assertEqual(self.get_shopping_list(), {'мука': 100})
+
+    def test_author_delete_cascades(self):
+        self.author.delete()
+        self.assertEqual(self.get_shopping_list(), {})
+
+    def test_recipe_delete_through_api(self):
+        response = self.get_client(self.author).delete(
+            f'/api/recipes/{self.other.pk}/'
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            self.get_shopping_list(), {'мука': 200, 'молоко': 300}
+        )
+
+
+class TagFilterTests(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        author = self.create_user('author')
+        self.breakfast, self.lunch, self.dinner = (
+            Tag.objects.create(name=name, slug=slug)
+            for name, slug in (
+                ('Завтрак', 'breakfast'),
+                ('Обед', 'lunch'),
+                ('Ужин', 'dinner'),
+            )
+        )
+        self.both = self.create_recipe(
+            author, name='Каша', tags=(self.breakfast, self.lunch)
+        )
+        self.lunch_only = self.create_recipe(
+            author, name='Суп', tags=(self.lunch,)
+        )
+        self.create_recipe(author, name='Рагу', tags=(self.dinner,))
+        self.create_recipe(author, name='Без тегов')
+
+    def filter_by(self, query):
+        return self.client.get(f'/api/recipes/?limit=100&{query}')
+
+    def test_each_recipe_is_returned_once(self):
+        data = self.filter_by('tags=breakfast&tags=lunch').json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(
+            sorted(recipe['id'] for recipe in data['results']),
+            [self.both.pk, self.lunch_only.pk]
+        )
+        self.assertEqual(
+            [recipe['id'] for recipe in self.filter_by(
+                'tags=breakfast'
+            ).json()['results']],
+            [self.both.pk]
+        )
+
+    def test_unknown_slug_is_rejected(self):
+        self.assertEqual(self.filter_by('tags=brunch').status_code, 400)
+        self.assertEqual(
+            self.filter_by('tags=lunch&tags=brunch').status_code, 400
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            brunch = Tag.objects.create(name='Бранч', slug='brunch')
+        self.assertEqual(self.filter_by('tags=brunch').json()['count'], 0)
+        self.both.tags.add(brunch)
+        self.assertEqual(
+            self.filter_by('tags=lunch&tags=brunch').json()['count'], 2
+        )
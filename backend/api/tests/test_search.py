@@ -0,0 +1,53 @@
+from unittest import mock
+
+from core.constants import RecipesConstants
+from recipes.models import Favorite, Ingredient, Tag
+from .base import FoodgramAPITestCase
+
+
+class RecipeSearchTests(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.reader = self.create_user('reader')
+        self.soup = Tag.objects.create(name='Супы', slug='soup')
+        beet = Ingredient.objects.create(name='свекла', measurement_unit='г')
+        self.tagged = self.create_recipe(
+            self.author, name='Борщ постный', tags=(self.soup,)
+        )
+        self.favorited = self.create_recipe(self.author, name='Борщ зелёный')
+        Favorite.objects.create(user=self.reader, recipe=self.favorited)
+        self.by_ingredient = self.create_recipe(
+            self.author, name='Винегрет', ingredients={beet: 100}
+        )
+        for number in range(5):
+            self.create_recipe(self.author, name=f'Борщ {number}')
+
+    def search(self, query, client=None):
+        response = (client or self.client).get(
+            f'/api/recipes/?limit=100&search={query}'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_matches_name_and_ingredients(self):
+        data = self.search('борщ')
+        self.assertEqual(data['count'], 7)
+        self.assertEqual(
+            [recipe['id'] for recipe in self.search('свекла')['results']],
+            [self.by_ingredient.pk]
+        )
+        self.assertEqual(self.search('пицца')['count'], 0)
+
+    @mock.patch.object(RecipesConstants, 'SEARCH_CANDIDATES', 2)
+    def test_candidates_are_taken_from_filtered_recipes(self):
+        data = self.search('борщ&tags=soup')
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['results'][0]['id'], self.tagged.pk)
+        data = self.search(
+            'борщ&is_favorited=1', self.get_client(self.reader)
+        )
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['results'][0]['id'], self.favorited.pk)
+        self.assertEqual(self.search('борщ')['count'], 2)
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from recipes.models import Favorite, ShoppingCart, TrendingRecipe
+from .base import FoodgramAPITestCase
+
+
+class TrendingTests(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.readers = [
+            self.create_user(f'reader{number}') for number in range(4)
+        ]
+        self.old, self.fresh, self.carted, self.expired, _ = (
+            self.create_recipe(self.author, name=f'Рецепт {number}')
+            for number in range(5)
+        )
+        now = timezone.now()
+        self.add_events(Favorite, self.old, 3, now - timedelta(days=6))
+        self.add_events(Favorite, self.fresh, 2, now)
+        self.add_events(ShoppingCart, self.carted, 1, now)
+        self.add_events(Favorite, self.expired, 4, now - timedelta(days=10))
+
+    def add_events(self, model, recipe, count, created_at):
+        model.objects.bulk_create(
+            model(user=reader, recipe=recipe)
+            for reader in self.readers[:count]
+        )
+        model.objects.filter(recipe=recipe).update(created_at=created_at)
+
+    def compute(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('compute_trending', stdout=StringIO())
+
+    def get_trending(self, query=''):
+        return [
+            recipe['id'] for recipe in self.client.get(
+                f'/api/recipes/?ordering=trending{query}'
+            ).json()['results']
+        ]
+
+    def test_scores_decay_with_time(self):
+        self.compute()
+        expected = [self.fresh.pk, self.carted.pk, self.old.pk]
+        self.assertEqual(
+            list(TrendingRecipe.objects.values_list('recipe', flat=True)),
+            expected
+        )
+        self.assertEqual(self.get_trending(), expected)
+        received = []
+        url = '/api/recipes/?ordering=trending&pagination=cursor&limit=1'
+        while url:
+            data = self.client.get(url).json()
+            received += [recipe['id'] for recipe in data['results']]
+            url = data['next']
+        self.assertEqual(received, expected)
+
+    def test_recompute_refreshes_cache(self):
+        self.compute()
+        self.assertEqual(self.get_trending()[0], self.fresh.pk)
+        self.add_events(ShoppingCart, self.old, 4, timezone.now())
+        self.compute()
+        self.assertEqual(self.get_trending()[0], self.old.pk)
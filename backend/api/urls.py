@@ -1,9 +1,9 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CustomUserViewSet, IngredientViewSet,
-                    RecipeRedirectView, RecipeViewSet,
-                    TagViewSet, UserSubscriptionsViewSet)
+from .views import (CustomUserViewSet, IngredientViewSet, RecipeViewSet,
+                    TagViewSet, UserSubscriptionsViewSet, metrics,
+                    recipe_link, recipe_short_link)
 
 
 app_name = 'api'
@@ -18,7 +18,10 @@ router.register(r'recipes', RecipeViewSet, basename='recipes')
 urlpatterns = [
     path('users/subscriptions/',
          UserSubscriptionsViewSet.as_view({'get': 'list'})),
-    path('link/<int:pk>/', RecipeRedirectView.as_view(), name='short-link'),
+    path('metrics', metrics, name='metrics'),
+    re_path(r'^s/(?P<code>[0-9a-zA-Z]+)/?$', recipe_short_link,
+            name='short-link'),
+    path('link/<int:pk>/', recipe_link, name='recipe-link'),
     path('', include(router.urls)),
     path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken')),
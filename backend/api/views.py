@@ -1,29 +1,61 @@
+import time
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.db.models import BooleanField, F, Prefetch, Value
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
 from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.views import APIView
 
+from core.cache import (CatalogueCacheMixin, ConditionalGetMixin,
+                        get_profile_version, get_relations_version,
+                        ingredient_catalogue, recipes_version,
+                        tag_catalogue)
+from core.constants import CacheConstants, RecipesConstants
 from core.filters import RecipeFilterSet, IngredientFilterSet
+from core.metrics import registry
+from core.pagination import (FeedPagination,
+                             OptionalKeysetPaginationMixin,
+                             SubscriptionKeysetPagination)
 from core.permissions import AuthorOrStaffOrReadOnly
 from recipes.models import (Favorite, Ingredient, Recipe, ShoppingCart,
-                            Subscription, Tag)
+                            ShoppingListItem, ShortLink, Subscription, Tag)
+from recipes.shortlinks import hit_counter, resolver
+from recipes.trending import trending_cache
+from .renderers import (ShoppingCartCSVRenderer, ShoppingCartJSONRenderer,
+                        ShoppingCartTextRenderer)
 from .serializers import (AvatarSerializer, CustomUserSerializer,
-                          IngredientSerializer, RecipeFavoriteSerializer,
+                          FavoriteReadSerializer, IngredientSerializer,
                           RecipeReadSerializer, RecipeSerializer,
-                          ShoppingCartSerializer, TagSerializer,
+                          ShoppingCartReadSerializer, TagSerializer,
                           UserReadSerializer, UserSetPasswordSerializer,
-                          UserSubscriptionSerializer)
+                          UserSubscriptionReadSerializer, get_recipes_limit)
 
 
 User = get_user_model()
 
+cache_constants = CacheConstants()
+recipe_constants = RecipesConstants()
+
+
+def with_subscription_recipes(users, recipes, request):
+    recipes_limit = get_recipes_limit(request)
+    if recipes_limit is not None:
+        recipes = recipes.limit_per_author(recipes_limit)
+    return users.annotate(
+        is_subscribed=Value(True, output_field=BooleanField())
+    ).prefetch_related(
+        Prefetch(
+            'recipes',
+            queryset=recipes.order_by('-id'),
+            to_attr='limited_recipes'
+        )
+    )
+
 
 class CustomUserViewSet(UserViewSet):
     queryset = User.objects.all()
@@ -81,32 +113,28 @@ class CustomUserViewSet(UserViewSet):
     )
     def subscribe(self, request, id):
         user = self.request.user
-        subscription = get_object_or_404(
-            User,
-            id=id
-        )
-        subscription_object_exists = Subscription.objects.filter(
-            user=user,
-            subscription=subscription
-        ).exists()
         if request.method == 'POST':
-            if user == subscription:
-                return Response(status=status.HTTP_400_BAD_REQUEST)
-            if subscription_object_exists:
+            if str(user.id) == str(id):
                 return Response(status=status.HTTP_400_BAD_REQUEST)
-            serializer = self.get_serializer(
-                data={'user': user.id, 'subscription': subscription.id})
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-            return Response(serializer.data,
-                            status=status.HTTP_201_CREATED)
-        if subscription_object_exists:
-            Subscription.objects.filter(
-                user=user,
-                subscription=subscription
-            ).delete()
+            changed = Subscription.objects.add(user.id, id)
+        else:
+            changed = Subscription.objects.remove(user.id, id)
+        if not changed:
+            get_object_or_404(User.objects.only('id'), id=id)
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        if request.method == 'DELETE':
             return Response(status=status.HTTP_204_NO_CONTENT)
-        return Response(status=status.HTTP_400_BAD_REQUEST)
+        author = with_subscription_recipes(
+            User.objects.filter(id=id),
+            Recipe.objects.filter(author_id=id),
+            request
+        ).get()
+        return Response(
+            UserSubscriptionReadSerializer(
+                author, context=self.get_serializer_context()
+            ).data,
+            status=status.HTTP_201_CREATED
+        )
 
     def get_serializer_class(self):
         if self.action == 'set_password':
@@ -114,87 +142,144 @@ class CustomUserViewSet(UserViewSet):
         if self.action in ('retrieve', 'list', 'me'):
             return UserReadSerializer
         if self.action == 'subscribe':
-            return UserSubscriptionSerializer
-        if self.action == 'subscriptions':
-            return UserSubscriptionSerializer
+            return UserSubscriptionReadSerializer
         if self.action == 'avatar':
             return AvatarSerializer
         return __class__.serializer_class
 
     def get_permissions(self):
-        if self.action == 'set_password' or self.action == 'me':
+        if self.action in ('set_password', 'me', 'subscribe', 'avatar'):
             self.permission_classes = (permissions.IsAuthenticated, )
         else:
             self.permission_classes = __class__.permission_classes
         return [permission() for permission in self.permission_classes]
 
 
-class UserSubscriptionsViewSet(mixins.ListModelMixin,
+class UserSubscriptionsViewSet(OptionalKeysetPaginationMixin,
+                               mixins.ListModelMixin,
                                viewsets.GenericViewSet):
-    serializer_class = UserSubscriptionSerializer
+    serializer_class = UserSubscriptionReadSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    keyset_pagination_class = SubscriptionKeysetPagination
 
     def get_queryset(self):
-        return Subscription.objects.filter(user=self.request.user)
+        user = self.request.user
+        return with_subscription_recipes(
+            User.objects.filter(subscriptions__user=user),
+            Recipe.objects.filter(author__subscriptions__user=user),
+            self.request
+        ).annotate(
+            subscription_pk=F('subscriptions__id')
+        ).order_by('subscription_pk')
 
 
 class TagViewSet(
+    CatalogueCacheMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet
 ):
     serializer_class = TagSerializer
     queryset = Tag.objects.all()
+    catalogue = tag_catalogue
     permission_classes = (permissions.AllowAny,)
     pagination_class = None
 
 
 class IngredientViewSet(
+    CatalogueCacheMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet
 ):
     serializer_class = IngredientSerializer
     queryset = Ingredient.objects.all()
+    catalogue = ingredient_catalogue
     permission_classes = (permissions.AllowAny,)
     pagination_class = None
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilterSet
 
+    @action(
+        methods=['get'],
+        detail=False
+    )
+    def autocomplete(self, request, *args, **kwargs):
+        query = request.query_params.get('name', '').strip()
+        try:
+            limit = min(
+                int(request.query_params.get('limit')),
+                recipe_constants.INGREDIENT_AUTOCOMPLETE_MAX_LIMIT
+            )
+        except (TypeError, ValueError):
+            limit = recipe_constants.INGREDIENT_AUTOCOMPLETE_LIMIT
+        if not query or limit < 1:
+            return Response([])
+        serializer = self.get_serializer(
+            Ingredient.objects.autocomplete(query, limit), many=True
+        )
+        return Response(serializer.data)
+
 
-class RecipeViewSet(viewsets.ModelViewSet):
-    queryset = Recipe.objects.all()
+class RecipeViewSet(ConditionalGetMixin, OptionalKeysetPaginationMixin,
+                    viewsets.ModelViewSet):
     serializer_class = RecipeSerializer
     permission_classes = (AuthorOrStaffOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilterSet
 
+    def get_queryset(self):
+        if self.action in ('list', 'retrieve', 'feed'):
+            return Recipe.objects.for_read(self.request.user)
+        return Recipe.objects.all()
+
+    def get_list_validators(self, request):
+        return self.get_etag(
+            request,
+            recipes_version.get(),
+            trending_cache.version.get(),
+            int(time.time() // cache_constants.COUNTERS_ETAG_INTERVAL)
+        ), None
+
+    def get_detail_validators(self, request):
+        state = Recipe.objects.filter(
+            pk=self.kwargs.get('pk')
+        ).values_list('updated_at', 'author_id').first()
+        if state is None:
+            return None, None
+        updated_at, author_id = state
+        return self.get_etag(
+            request, updated_at, get_profile_version(author_id).get()
+        ), updated_at
+
+    def get_etag(self, request, *state):
+        user = request.user
+        return self.make_etag(
+            request.get_full_path(),
+            *state,
+            tag_catalogue.get_version(),
+            ingredient_catalogue.get_version(),
+            user.pk,
+            get_relations_version(user.pk).get()
+            if user.is_authenticated else None
+        )
+
     def favorite_or_shopping_cart(self, request, model_name, *args, **kwargs):
         user = self.request.user
-        recipe = get_object_or_404(Recipe, id=self.kwargs.get('pk'))
-        model_object_exists = model_name.objects.filter(
-            user=user,
-            recipe=recipe
-        ).exists()
-
+        recipe_id = self.kwargs.get('pk')
         if request.method == 'POST':
-            if model_object_exists:
-                return Response(status=status.HTTP_400_BAD_REQUEST)
-
-            serializer = self.get_serializer(
-                data={'user': user.id, 'recipe': recipe.id})
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-            return Response(serializer.data,
-                            status=status.HTTP_201_CREATED)
-
-        if not model_object_exists:
+            changed = model_name.objects.add(user.id, recipe_id)
+        else:
+            changed = model_name.objects.remove(user.id, recipe_id)
+        if not changed:
+            get_object_or_404(Recipe.objects.only('id'), pk=recipe_id)
             return Response(status=status.HTTP_400_BAD_REQUEST)
-
-        get_object_or_404(
-            model_name,
-            user=user,
-            recipe=recipe
-        ).delete()
+        if request.method == 'POST':
+            recipe = Recipe.objects.only(
+                'id', 'name', 'image', 'cooking_time'
+            ).get(pk=recipe_id)
+            return Response(self.get_serializer_class()(recipe).data,
+                            status=status.HTTP_201_CREATED)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -217,35 +302,45 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     @action(
         methods=['get'],
-        detail=False
+        detail=False,
+        permission_classes=(permissions.IsAuthenticated,),
+        renderer_classes=(ShoppingCartTextRenderer, ShoppingCartCSVRenderer,
+                          ShoppingCartJSONRenderer)
     )
     def download_shopping_cart(self, request, *args, **kwargs):
-        ingredients = ShoppingCart.objects.filter(
+        ingredients = ShoppingListItem.objects.filter(
             user=request.user
         ).values(
-            'recipe__ingredients__name',
-            'recipe__ingredients__measurement_unit'
-        ).annotate(
-            total_amount=Sum('recipe__recipe_ingredients__amount')
-        ).order_by('recipe__ingredients__name')
-
-        result = [
-            (
-                f"\n- {ingredient['recipe__ingredients__name']} - "
-                f"{ingredient['total_amount']}"
-                f"{ingredient['recipe__ingredients__measurement_unit']}"
-            ) for ingredient in ingredients
-        ]
-        result.insert(0, 'Cписок покупок:')
-        response = HttpResponse(
-            result,
-            content_type='text/plain',
+            'total_amount',
+            name=F('ingredient__name'),
+            measurement_unit=F('ingredient__measurement_unit')
+        ).order_by('name')
+
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(ingredients.iterator(
+                chunk_size=recipe_constants.SHOPPING_CART_CHUNK_SIZE
+            )),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
         )
         response['Content-Disposition'] = (
-            'attachment; filename=shopping_cart'
+            f'attachment; filename=shopping_cart.{renderer.format}'
         )
         return response
 
+    @action(
+        methods=['get'],
+        detail=False,
+        permission_classes=(permissions.IsAuthenticated,)
+    )
+    def feed(self, request, *args, **kwargs):
+        paginator = FeedPagination()
+        page = paginator.paginate_queryset(
+            self.get_queryset(), request, view=self
+        )
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(
         methods=['get'],
         detail=True,
@@ -253,29 +348,48 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     )
     def get_link(self, request, *args, **kwargs):
-        hostname = request.META.get('HTTP_HOST')
-        if not hostname:
-            hostname = settings.ALLOWED_HOSTS[0]
-        short_link = f"http://{hostname}/link/{self.kwargs.get('pk')}"
-        return Response({'short-link': short_link})
+        recipe = get_object_or_404(
+            Recipe.objects.only('id'), pk=self.kwargs.get('pk')
+        )
+        link = ShortLink.objects.get_or_create_for(recipe.id)
+        return Response({
+            'short-link': request.build_absolute_uri(f'/s/{link.code}')
+        })
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'feed'):
             return RecipeReadSerializer
         if self.action == 'favorite':
-            return RecipeFavoriteSerializer
+            return FavoriteReadSerializer
         if self.action == 'shopping_cart':
-            return ShoppingCartSerializer
+            return ShoppingCartReadSerializer
         return __class__.serializer_class
 
     def get_permissions(self):
         return [permission() for permission in self.permission_classes]
 
 
-class RecipeRedirectView(APIView):
-    def get(self, request, *args, **kwargs):
-        hostname = request.META.get('HTTP_HOST')
-        if not hostname:
-            hostname = settings.ALLOWED_HOSTS[0]
-        redirect_url = f"http://{hostname}/recipes/{self.kwargs.get('pk')}"
-        return redirect(redirect_url)
+def recipe_short_link(request, code):
+    recipe_id = resolver.resolve(code)
+    if recipe_id is None:
+        raise Http404
+    hit_counter.add(code)
+    return redirect(f'/recipes/{recipe_id}')
+
+
+def recipe_link(request, pk):
+    if not Recipe.objects.filter(pk=pk).exists():
+        raise Http404
+    return redirect(f'/recipes/{pk}')
+
+
+def metrics(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if settings.METRICS_TOKEN and request.META.get(
+        'HTTP_AUTHORIZATION'
+    ) != f'Bearer {settings.METRICS_TOKEN}':
+        return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
@@ -0,0 +1,100 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .cache import CacheVersion
+from .constants import CacheConstants
+
+
+cache_constants = CacheConstants()
+
+
+def get_token_version(user_id):
+    return CacheVersion(f'auth:token:user:{user_id}:version')
+
+
+class TokenCache:
+
+    def __init__(self):
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def invalidate(user_id):
+        transaction.on_commit(get_token_version(user_id).bump)
+
+    @staticmethod
+    def get_cache_key(key):
+        return 'auth:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        cache_key = self.get_cache_key(key)
+        with self.lock:
+            entry = self.local.get(cache_key)
+            if entry is not None and entry[2] < time.monotonic():
+                del self.local[cache_key]
+                entry = None
+        if entry is not None:
+            user_id, version, _, payload = entry
+        else:
+            entry = cache.get(cache_key)
+            if entry is None:
+                return None
+            user_id, version, payload = entry
+        if get_token_version(user_id).get() != version:
+            with self.lock:
+                self.local.pop(cache_key, None)
+            return None
+        with self.lock:
+            if cache_key in self.local:
+                self.local.move_to_end(cache_key)
+            else:
+                self.remember(cache_key, user_id, version, payload)
+        return pickle.loads(payload)
+
+    def set(self, key, user, version):
+        cache_key = self.get_cache_key(key)
+        payload = pickle.dumps(user)
+        cache.set(
+            cache_key,
+            (user.pk, version, payload),
+            cache_constants.AUTH_TOKEN_CACHE_TIMEOUT
+        )
+        with self.lock:
+            self.remember(cache_key, user.pk, version, payload)
+
+    def remember(self, cache_key, user_id, version, payload):
+        self.local[cache_key] = (
+            user_id,
+            version,
+            time.monotonic() + cache_constants.AUTH_TOKEN_CACHE_TIMEOUT,
+            payload
+        )
+        self.local.move_to_end(cache_key)
+        while len(self.local) > cache_constants.AUTH_TOKEN_LOCAL_SIZE:
+            self.local.popitem(last=False)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        if user is not None:
+            return user, Token(key=key, user=user)
+        user_id = Token.objects.filter(key=key).values_list(
+            'user_id', flat=True
+        ).first()
+        version = get_token_version(user_id).get() if user_id else None
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, version)
+        return user, token
@@ -0,0 +1,195 @@
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+
+from .constants import CacheConstants
+
+
+cache_constants = CacheConstants()
+
+
+class CacheVersion:
+
+    def __init__(self, key):
+        self.key = key
+
+    def get(self):
+        version = cache.get(self.key)
+        if version is None:
+            cache.add(self.key, time.time_ns(), timeout=None)
+            version = cache.get(self.key)
+        return version
+
+    def bump(self):
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            cache.add(self.key, time.time_ns(), timeout=None)
+
+
+recipes_version = CacheVersion('recipes:version')
+
+
+def get_profile_version(user_id):
+    return CacheVersion(f'users:{user_id}:profile:version')
+
+
+def get_relations_version(user_id):
+    return CacheVersion(f'users:{user_id}:relations:version')
+
+
+class CatalogueCache:
+
+    def __init__(self, name):
+        self.name = name
+        self.version = CacheVersion(f'catalogue:{name}:version')
+        self.local = {}
+        self.lock = threading.Lock()
+
+    def get_version(self):
+        return self.version.get()
+
+    def invalidate(self):
+        self.version.bump()
+        with self.lock:
+            self.local.clear()
+
+    def get(self, key, build):
+        version = self.get_version()
+        with self.lock:
+            entry = self.local.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1:]
+        cache_key = 'catalogue:{}:{}:{}'.format(
+            self.name, version, hashlib.md5(key.encode()).hexdigest()
+        )
+        entry = cache.get(cache_key)
+        if entry is None:
+            body = build()
+            entry = (hashlib.md5(body).hexdigest(), body)
+            cache.set(
+                cache_key, entry, cache_constants.CATALOGUE_CACHE_TIMEOUT
+            )
+        with self.lock:
+            if len(self.local) >= cache_constants.CATALOGUE_LOCAL_SIZE:
+                self.local.clear()
+            self.local[key] = (version, *entry)
+        return entry
+
+
+tag_catalogue = CatalogueCache('tags')
+ingredient_catalogue = CatalogueCache('ingredients')
+
+
+def set_proxy_cache_headers(request, response):
+    if request.user.is_authenticated:
+        return
+    response['X-Accel-Expires'] = (
+        cache_constants.PROXY_CACHE_FILTERED_TIMEOUT
+        if request.GET else cache_constants.PROXY_CACHE_TIMEOUT
+    )
+
+
+class CatalogueCacheMixin:
+    catalogue = None
+
+    def list(self, request, *args, **kwargs):
+        key = 'list:' + '&'.join(sorted(
+            f'{name}={value}'
+            for name, values in request.query_params.lists()
+            for value in values
+        ))
+        return self.get_catalogue_response(
+            request, key, lambda: super(CatalogueCacheMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        key = f'detail:{self.kwargs[self.lookup_field]}'
+        return self.get_catalogue_response(
+            request, key, lambda: super(CatalogueCacheMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
+
+    def get_catalogue_response(self, request, key, get_response):
+        etag, body = self.catalogue.get(
+            key, lambda: JSONRenderer().render(get_response().data)
+        )
+        etag = f'"{etag}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        set_proxy_cache_headers(request, response)
+        return response
+
+
+class ConditionalGetMixin:
+
+    def get_list_validators(self, request):
+        return None, None
+
+    def get_detail_validators(self, request):
+        return None, None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_validated_response(
+            request, self.get_list_validators(request),
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_validated_response(
+            request, self.get_detail_validators(request),
+            lambda: super(ConditionalGetMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
+
+    @staticmethod
+    def make_etag(*parts):
+        return '"{}"'.format(hashlib.md5(
+            ':'.join(str(part) for part in parts).encode()
+        ).hexdigest())
+
+    def get_validated_response(self, request, validators, get_response):
+        etag, last_modified = validators
+        timestamp = (
+            int(last_modified.timestamp()) if last_modified else None
+        )
+        response = None
+        if etag is not None or timestamp is not None:
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+        if response is None:
+            response = get_response()
+        if response.status_code not in (200, 304):
+            return response
+        if etag is not None:
+            response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=cache_constants.ANONYMOUS_MAX_AGE
+            )
+            set_proxy_cache_headers(request, response)
+        patch_vary_headers(response, ('Authorization',))
+        return response
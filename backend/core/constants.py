@@ -15,3 +15,71 @@ class RecipesConstants:
     INGREDIENT_NAME_LENGTH = 128
     INGREDIENT_MEASUREMENT_UNIT_LENGTH = 64
     RECIPE_NAME_LENGTH = 256
+    SHOPPING_CART_CHUNK_SIZE = 2000
+    SHOPPING_LIST_UPSERT_BATCH_SIZE = 300
+    INGREDIENT_AUTOCOMPLETE_LIMIT = 10
+    INGREDIENT_AUTOCOMPLETE_MAX_LIMIT = 50
+    INGREDIENT_SIMILARITY = 0.3
+    SHORT_LINK_ALPHABET = (
+        '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    )
+    SHORT_LINK_CODE_LENGTH = 7
+    SHORT_LINK_MAX_LENGTH = 16
+    SHORT_LINK_ATTEMPTS = 5
+    SEARCH_CONFIG = 'russian'
+    SEARCH_CANDIDATES = 1000
+    SEARCH_STEM_MIN_LENGTH = 5
+    FEED_MAX_LENGTH = 500
+    FEED_FANOUT_MAX_SUBSCRIBERS = 5000
+    TRENDING_WINDOW_DAYS = 7
+    TRENDING_HALF_LIFE_HOURS = 48
+    TRENDING_FAVORITE_WEIGHT = 1.0
+    TRENDING_SHOPPING_CART_WEIGHT = 0.5
+    TRENDING_TABLE_SIZE = 1000
+    TRENDING_TOP_SIZE = 100
+
+
+class CacheConstants:
+    __slots__ = ()
+    CATALOGUE_CACHE_TIMEOUT = 24 * 60 * 60
+    CATALOGUE_LOCAL_SIZE = 1024
+    AUTH_TOKEN_CACHE_TIMEOUT = 5 * 60
+    AUTH_TOKEN_LOCAL_SIZE = 1024
+    ANONYMOUS_MAX_AGE = 10
+    COUNTERS_ETAG_INTERVAL = 60
+    PROXY_CACHE_TIMEOUT = 5 * 60
+    PROXY_CACHE_FILTERED_TIMEOUT = 10
+    PROXY_PURGE_TIMEOUT = 2
+    SHORT_LINK_CACHE_TIMEOUT = 24 * 60 * 60
+    SHORT_LINK_LOCAL_SIZE = 4096
+    SHORT_LINK_FLUSH_INTERVAL = 10
+    SHORT_LINK_FLUSH_SIZE = 100
+
+
+class DatabaseConstants:
+    __slots__ = ()
+    REPLICA_PIN_TIMEOUT = 5
+    PRIMARY_ONLY_MODELS = ('authtoken.Token', 'recipes.ShortLink')
+
+
+class PaginationConstants:
+    __slots__ = ()
+    MAX_PAGE_SIZE = 100
+
+
+class ImageConstants:
+    __slots__ = ()
+    THUMBNAIL_WIDTHS = (160, 480)
+    THUMBNAIL_FORMAT = 'WEBP'
+    THUMBNAIL_EXTENSION = 'webp'
+    THUMBNAIL_QUALITY = 80
+    ORIGINAL_QUALITY = 90
+    WORKERS = 2
+    BASE64_CHUNK_SIZE = 64 * 1024
+    READY_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+class MetricsConstants:
+    __slots__ = ()
+    DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+    LOGGED_DUPLICATE_QUERIES = 5
@@ -1,6 +1,7 @@
 from django_filters.rest_framework import FilterSet, filters
 
-from recipes.models import Tag, Ingredient, Recipe
+from recipes.models import Ingredient, Recipe
+from recipes.tags import get_tag_choices, tag_slugs
 
 
 class RecipeFilterSet(FilterSet):
@@ -10,15 +11,27 @@ class RecipeFilterSet(FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_by_parameter'
     )
-    tags = filters.ModelMultipleChoiceFilter(
-        queryset=Tag.objects.all(),
-        field_name='tags__slug',
-        to_field_name='slug'
+    search = filters.CharFilter(method='filter_search')
+    tags = filters.MultipleChoiceFilter(
+        choices=get_tag_choices,
+        method='filter_tags'
+    )
+
+    ordering = filters.ChoiceFilter(
+        choices=(
+            ('favorites_count', 'favorites_count'),
+            ('-favorites_count', '-favorites_count'),
+            ('trending', 'trending')
+        ),
+        method='filter_ordering'
     )
 
     class Meta:
         model = Recipe
-        fields = ('author', 'is_favorited', 'is_in_shopping_cart', 'tags')
+        fields = (
+            'author', 'is_favorited', 'is_in_shopping_cart', 'tags', 'search',
+            'ordering'
+        )
 
     def filter_by_parameter(self, queryset, name, value):
         user = self.request.user
@@ -30,6 +43,19 @@ class RecipeFilterSet(FilterSet):
             return queryset.filter(shoppingcarts__user=user)
         return queryset
 
+    def filter_tags(self, queryset, name, value):
+        return queryset.with_tags(tag_slugs.get_ids(value))
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
+
+    def filter_ordering(self, queryset, name, value):
+        if value == 'trending':
+            return queryset.trending()
+        if value.startswith('-'):
+            return queryset.order_by(value, '-created_at', '-id')
+        return queryset.order_by(value, 'created_at', 'id')
+
 
 class IngredientFilterSet(FilterSet):
     name = filters.CharFilter(lookup_expr='istartswith')
@@ -0,0 +1,154 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from .constants import ImageConstants
+
+
+logger = logging.getLogger(__name__)
+
+image_constants = ImageConstants()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_thumbnail_name(name, width):
+    path = PurePosixPath(name)
+    return str(
+        path.parent / 'thumbnails'
+        / f'{path.stem}_{width}.{image_constants.THUMBNAIL_EXTENSION}'
+    )
+
+
+def get_thumbnail_urls(image, request=None):
+    if not image:
+        return {}
+    ready = has_ready_thumbnails(image.name)
+    urls = {}
+    for width in image_constants.THUMBNAIL_WIDTHS:
+        url = default_storage.url(
+            get_thumbnail_name(image.name, width) if ready else image.name
+        )
+        urls[str(width)] = (
+            request.build_absolute_uri(url) if request is not None else url
+        )
+    return urls
+
+
+def get_ready_key(name):
+    return f'thumbnails:{hashlib.md5(name.encode()).hexdigest()}:ready'
+
+
+def has_ready_thumbnails(name):
+    if cache.get(get_ready_key(name)):
+        return True
+    ready = has_fresh_thumbnails(name)
+    if ready:
+        cache.set(
+            get_ready_key(name), True, image_constants.READY_CACHE_TIMEOUT
+        )
+    return ready
+
+
+def strip_metadata(name, image):
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        return
+    temporary_path = f'{path}.tmp'
+    image.save(
+        temporary_path,
+        format=image.format,
+        quality=image_constants.ORIGINAL_QUALITY
+    )
+    os.replace(temporary_path, path)
+
+
+def has_fresh_thumbnails(name):
+    try:
+        modified_time = default_storage.get_modified_time(name)
+        return all(
+            default_storage.exists(get_thumbnail_name(name, width))
+            and default_storage.get_modified_time(
+                get_thumbnail_name(name, width)
+            ) >= modified_time
+            for width in image_constants.THUMBNAIL_WIDTHS
+        )
+    except (NotImplementedError, OSError):
+        return False
+
+
+def process_image(name, force=False):
+    if not force and has_fresh_thumbnails(name):
+        return False
+    cache.delete(get_ready_key(name))
+    with default_storage.open(name) as file:
+        image = Image.open(file)
+        image.load()
+    image_format = image.format
+    if image.info.get('exif'):
+        image = ImageOps.exif_transpose(image)
+        image.format = image_format
+        image.info = {
+            key: value for key, value in image.info.items()
+            if key == 'transparency'
+        }
+        strip_metadata(name, image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    for width in image_constants.THUMBNAIL_WIDTHS:
+        thumbnail_name = get_thumbnail_name(name, width)
+        if default_storage.exists(thumbnail_name):
+            default_storage.delete(thumbnail_name)
+        thumbnail = image.copy()
+        thumbnail.thumbnail((width, width * 4))
+        buffer = io.BytesIO()
+        thumbnail.save(
+            buffer,
+            format=image_constants.THUMBNAIL_FORMAT,
+            quality=image_constants.THUMBNAIL_QUALITY
+        )
+        default_storage.save(thumbnail_name, ContentFile(buffer.getvalue()))
+    return True
+
+
+def _process_image_safely(name, versions):
+    try:
+        processed = process_image(name)
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', name)
+        return
+    if processed:
+        for version in versions:
+            version.bump()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=image_constants.WORKERS,
+                thread_name_prefix='images'
+            )
+        return _executor
+
+
+def schedule_image_processing(image, *versions):
+    if not image:
+        return
+    name = image.name
+    transaction.on_commit(
+        lambda: get_executor().submit(_process_image_safely, name, versions)
+    )
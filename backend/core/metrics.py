@@ -0,0 +1,116 @@
+import re
+import threading
+from collections import defaultdict
+
+from .constants import MetricsConstants
+
+
+metrics_constants = MetricsConstants()
+
+FINGERPRINT_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+COUNTERS = (
+    ('requests_total', 'Количество запросов'),
+    ('db_queries_total', 'Количество SQL-запросов'),
+    ('db_duration_seconds_total', 'Время выполнения SQL-запросов'),
+    ('serializer_duration_seconds_total',
+     'Время работы представления без учета SQL-запросов'),
+    ('response_bytes_total', 'Размер ответов'),
+    ('duplicate_queries_total', 'Количество повторяющихся SQL-запросов'),
+)
+
+
+def get_fingerprint(sql):
+    for pattern, replacement in FINGERPRINT_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def escape_label(value):
+    return (
+        str(value).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+class MetricsRegistry:
+
+    def __init__(self, prefix='foodgram'):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = defaultdict(lambda: defaultdict(float))
+            self.buckets = defaultdict(
+                lambda: [0] * len(metrics_constants.DURATION_BUCKETS)
+            )
+            self.durations = defaultdict(float)
+
+    def observe(self, labels, duration, **values):
+        with self.lock:
+            counters = self.counters[labels]
+            counters['requests_total'] += 1
+            for name, value in values.items():
+                counters[name] += value
+            self.durations[labels] += duration
+            buckets = self.buckets[labels]
+            for index, bound in enumerate(
+                metrics_constants.DURATION_BUCKETS
+            ):
+                if duration <= bound:
+                    buckets[index] += 1
+
+    def render(self):
+        lines = []
+        with self.lock:
+            items = sorted(self.counters.items())
+            for name, description in COUNTERS:
+                metric = f'{self.prefix}_{name}'
+                lines.append(f'# HELP {metric} {description}')
+                lines.append(f'# TYPE {metric} counter')
+                for labels, counters in items:
+                    lines.append(
+                        f'{metric}{{{self.format_labels(labels)}}} '
+                        f'{counters[name]:g}'
+                    )
+            metric = f'{self.prefix}_request_duration_seconds'
+            lines.append(f'# HELP {metric} Время обработки запросов')
+            lines.append(f'# TYPE {metric} histogram')
+            for labels, counters in items:
+                label_string = self.format_labels(labels)
+                for bound, count in zip(
+                    metrics_constants.DURATION_BUCKETS, self.buckets[labels]
+                ):
+                    lines.append(
+                        f'{metric}_bucket{{{label_string},le="{bound}"}} '
+                        f'{count}'
+                    )
+                lines.append(
+                    f'{metric}_bucket{{{label_string},le="+Inf"}} '
+                    f'{counters["requests_total"]:g}'
+                )
+                lines.append(
+                    f'{metric}_sum{{{label_string}}} '
+                    f'{self.durations[labels]:g}'
+                )
+                lines.append(
+                    f'{metric}_count{{{label_string}}} '
+                    f'{counters["requests_total"]:g}'
+                )
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def format_labels(labels):
+        view, method = labels
+        return f'view="{escape_label(view)}",method="{escape_label(method)}"'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,157 @@
+import hashlib
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .constants import DatabaseConstants, MetricsConstants
+from .metrics import get_fingerprint, registry
+from .routers import replica_reads
+
+
+logger = logging.getLogger(__name__)
+
+database_constants = DatabaseConstants()
+metrics_constants = MetricsConstants()
+
+
+class QueryRecorder:
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+        self.fingerprints = Counter()
+        self.view_started = None
+        self.view_db_offset = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[get_fingerprint(sql)] += 1
+
+    def get_duplicates(self):
+        return [
+            (fingerprint, count)
+            for fingerprint, count in self.fingerprints.most_common()
+            if count > 1
+        ]
+
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = request.query_recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        self.record(request, response, recorder, duration)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        recorder = request.query_recorder
+        recorder.view_started = time.perf_counter()
+        recorder.view_db_offset = recorder.duration
+
+    def record(self, request, response, recorder, duration):
+        view_time = 0
+        if recorder.view_started is not None:
+            view_time = max(
+                time.perf_counter() - recorder.view_started
+                - recorder.duration + recorder.view_db_offset,
+                0
+            )
+        size = 0
+        if not response.streaming:
+            size = len(response.content)
+        duplicates = recorder.get_duplicates()
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match.route) if match else 'unresolved'
+        registry.observe(
+            (view, request.method),
+            duration,
+            db_queries_total=recorder.count,
+            db_duration_seconds_total=recorder.duration,
+            serializer_duration_seconds_total=view_time,
+            response_bytes_total=size,
+            duplicate_queries_total=sum(count - 1 for _, count in duplicates)
+        )
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={recorder.duration * 1000:.1f};'
+            f'desc="{recorder.count} queries"',
+            f'serializer;dur={view_time * 1000:.1f}',
+            f'total;dur={duration * 1000:.1f}',
+        ))
+        if (
+            duration * 1000 >= settings.METRICS_SLOW_REQUEST_MS
+            or recorder.count >= settings.METRICS_QUERY_COUNT_THRESHOLD
+        ):
+            logger.warning(
+                'Медленный запрос %s %s (%s): %.1f мс, SQL-запросов %s '
+                '(%.1f мс), размер ответа %s байт, повторы: %s',
+                request.method,
+                request.path,
+                view,
+                duration * 1000,
+                recorder.count,
+                recorder.duration * 1000,
+                size,
+                '; '.join(
+                    f'{count}x {fingerprint}'
+                    for fingerprint, count in duplicates[
+                        :metrics_constants.LOGGED_DUPLICATE_QUERIES
+                    ]
+                ) or 'нет'
+            )
+
+
+class ReplicaRoutingMiddleware:
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    @staticmethod
+    def get_pin_key(request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        return 'db:primary:{}'.format(
+            hashlib.md5(authorization.encode()).hexdigest()
+        )
+
+    def __call__(self, request):
+        pin_key = self.get_pin_key(request)
+        safe = request.method in SAFE_METHODS
+        token = replica_reads.set(
+            safe
+            and request.path.startswith('/api/')
+            and not (pin_key and cache.get(pin_key))
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        if not safe and pin_key and response.status_code < 400:
+            cache.set(
+                pin_key, True, database_constants.REPLICA_PIN_TIMEOUT
+            )
+        return response
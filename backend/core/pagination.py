@@ -0,0 +1,200 @@
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       PageNumberPagination)
+from rest_framework.response import Response
+
+from .constants import PaginationConstants
+from recipes.models import FeedEntry
+
+
+pagination_constants = PaginationConstants()
+
+
+class LimitPageNumberPagination(PageNumberPagination):
+    page_size_query_param = 'limit'
+    max_page_size = pagination_constants.MAX_PAGE_SIZE
+
+
+class KeysetPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = pagination_constants.MAX_PAGE_SIZE
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = queryset.query.order_by
+        if not ordering or not all(
+            isinstance(field, str) and '__' not in field
+            for field in ordering
+        ):
+            ordering = super().get_ordering(request, queryset, view)
+        ordering = tuple(ordering)
+        if not {'id', 'pk'} & {field.lstrip('-') for field in ordering}:
+            ordering += ('-id' if ordering[-1].startswith('-') else 'id',)
+        return ordering
+
+    @staticmethod
+    def get_keyset_filter(ordering, position):
+        condition = None
+        for field, value in reversed(list(zip(ordering, position))):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            after = Q(**{f'{name}__{lookup}': value})
+            condition = after if condition is None else (
+                after | Q(**{name: value}) & condition
+            )
+        return condition
+
+    def get_position(self):
+        if self.cursor is None or self.cursor.position is None:
+            return None
+        try:
+            position = json.loads(self.cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(
+            self.ordering
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_position(self, instance):
+        return json.dumps([
+            str(getattr(instance, field.lstrip('-')))
+            for field in self.ordering
+        ])
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        self.count = None
+        if request.query_params.get(self.count_query_param) in (
+            '1', 'true', 'True'
+        ):
+            self.count = queryset.count()
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in ordering
+            )
+        queryset = queryset.order_by(*ordering)
+        position = self.get_position()
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(ordering, position)
+            )
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(
+            offset=0,
+            reverse=False,
+            position=self.encode_position(self.page[-1])
+        ))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(
+            offset=0,
+            reverse=True,
+            position=self.encode_position(self.page[0])
+        ))
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
+
+
+class SubscriptionKeysetPagination(KeysetPagination):
+    ordering = ('subscription_pk',)
+
+
+class FeedPagination(KeysetPagination):
+
+    def get_position(self):
+        if self.cursor is None or self.cursor.position is None:
+            return None
+        created_at, _, recipe_id = self.cursor.position.rpartition('_')
+        try:
+            return datetime.fromisoformat(created_at), int(recipe_id)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        self.count = None
+        if request.query_params.get(self.count_query_param) in (
+            '1', 'true', 'True'
+        ):
+            self.count = FeedEntry.objects.count_for(request.user)
+        keys = FeedEntry.objects.get_page(
+            request.user, self.page_size + 1, self.get_position()
+        )
+        self.has_next = len(keys) > self.page_size
+        keys = keys[:self.page_size]
+        self.last_key = keys[-1] if keys else None
+        recipes = queryset.in_bulk([recipe_id for _, recipe_id in keys])
+        return [
+            recipes[recipe_id] for _, recipe_id in keys
+            if recipe_id in recipes
+        ]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        created_at, recipe_id = self.last_key
+        return self.encode_cursor(Cursor(
+            offset=0,
+            reverse=False,
+            position=f'{created_at.isoformat()}_{recipe_id}'
+        ))
+
+    def get_previous_link(self):
+        return None
+
+
+class OptionalKeysetPaginationMixin:
+    keyset_pagination_class = KeysetPagination
+    pagination_query_param = 'pagination'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get(
+                self.pagination_query_param
+            ) == 'cursor':
+                self._paginator = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
@@ -0,0 +1,52 @@
+import logging
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+from .constants import CacheConstants
+
+
+logger = logging.getLogger(__name__)
+
+cache_constants = CacheConstants()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='purge'
+            )
+        return _executor
+
+
+def refresh_paths(paths):
+    for host in settings.PROXY_CACHE_HOSTS:
+        for path in paths:
+            request = urllib.request.Request(
+                settings.PROXY_CACHE_PURGE_URL + path, headers={'Host': host}
+            )
+            try:
+                urllib.request.urlopen(
+                    request, timeout=cache_constants.PROXY_PURGE_TIMEOUT
+                ).close()
+            except (OSError, urllib.error.URLError) as error:
+                logger.warning(
+                    'Не удалось обновить кеш %s%s: %s', host, path, error
+                )
+
+
+def purge_proxy_cache(*paths):
+    if not settings.PROXY_CACHE_PURGE_URL:
+        return
+    transaction.on_commit(
+        lambda: get_executor().submit(refresh_paths, paths)
+    )
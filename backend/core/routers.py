@@ -0,0 +1,29 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .constants import DatabaseConstants
+
+
+database_constants = DatabaseConstants()
+
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (
+            not replica_reads.get()
+            or not settings.DATABASE_REPLICAS
+            or model._meta.label in database_constants.PRIMARY_ONLY_MODELS
+        ):
+            return 'default'
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -0,0 +1,100 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from recipes.models import Recipe, ShortLink
+from recipes.shortlinks import hit_counter
+
+
+User = get_user_model()
+
+
+@skipUnless(
+    'replica_1' in settings.DATABASES,
+    'Нужна тестовая реплика: DB_REPLICA_TEST=True'
+)
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRoutingTests(APITestCase):
+    databases = {'default', 'replica_1'}
+
+    def setUp(self):
+        cache.clear()
+        self.user, self.author = (
+            User.objects.create_user(
+                username=username,
+                email=f'{username}@example.com',
+                first_name='Имя',
+                last_name='Фамилия',
+                password='pass12345!'
+            )
+            for username in ('reader', 'author')
+        )
+        self.token = Token.objects.create(user=self.user)
+        User.objects.db_manager('replica_1').create_user(
+            username='replica',
+            email='replica@example.com',
+            password='pass12345!'
+        )
+
+    def get_users_count(self, **headers):
+        return self.client.get('/api/users/', **headers).json()['count']
+
+    def test_safe_api_requests_read_from_replica(self):
+        self.assertEqual(self.get_users_count(), 1)
+        self.assertEqual(
+            self.get_users_count(
+                HTTP_AUTHORIZATION=f'Token {self.token.key}'
+            ),
+            1
+        )
+
+    def test_writer_is_pinned_to_primary(self):
+        authorization = f'Token {self.token.key}'
+        response = self.client.post(
+            f'/api/users/{self.author.pk}/subscribe/',
+            HTTP_AUTHORIZATION=authorization
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            self.get_users_count(HTTP_AUTHORIZATION=authorization), 2
+        )
+        self.assertEqual(self.get_users_count(), 1)
+
+    def test_short_links_are_read_from_primary(self):
+        recipe = Recipe.objects.create(
+            author=self.author,
+            name='Каша',
+            image='recipes/images/porridge.png',
+            text='Сварить',
+            cooking_time=10
+        )
+        User.objects.using('replica_1').bulk_create([self.author])
+        Recipe.objects.using('replica_1').bulk_create([recipe])
+        link = ShortLink.objects.create(recipe=recipe, code='abc1234')
+
+        response = self.client.get(f'/api/recipes/{recipe.pk}/get-link/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['short-link'].endswith('/s/abc1234'))
+        self.assertEqual(ShortLink.objects.count(), 1)
+
+        missing = self.client.get('/api/s/zzz9999/')
+        self.assertEqual(missing.status_code, 404)
+        ShortLink.objects.create(recipe=Recipe.objects.create(
+            author=self.author,
+            name='Суп',
+            image='recipes/images/soup.png',
+            text='Сварить',
+            cooking_time=30
+        ), code='zzz9999')
+        self.assertEqual(self.client.get('/api/s/zzz9999/').status_code, 302)
+        self.assertEqual(
+            self.client.get(f'/api/s/{link.code}/').status_code, 302
+        )
+        hit_counter.flush()
+        link.refresh_from_db()
+        self.assertEqual(link.hits, 1)
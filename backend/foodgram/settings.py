@@ -18,6 +18,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'djoser',
     'rest_framework.authtoken',
@@ -29,6 +30,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -38,6 +41,25 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+METRICS_ENABLED = os.getenv('METRICS_ENABLED') == 'True'
+
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+METRICS_SLOW_REQUEST_MS = int(os.getenv('METRICS_SLOW_REQUEST_MS', 500))
+
+METRICS_QUERY_COUNT_THRESHOLD = int(
+    os.getenv('METRICS_QUERY_COUNT_THRESHOLD', 20)
+)
+
+PROXY_CACHE_PURGE_URL = os.getenv('PROXY_CACHE_PURGE_URL', '').rstrip('/')
+
+PROXY_CACHE_HOSTS = [
+    host for host in os.getenv(
+        'PROXY_CACHE_HOSTS', ';'.join(ALLOWED_HOSTS)
+    ).split(';')
+    if host and '*' not in host and not host.startswith('.')
+]
+
 ROOT_URLCONF = 'foodgram.urls'
 
 TEMPLATES = [
@@ -69,6 +91,43 @@ DATABASES = {
     }
 }
 
+DATABASE_REPLICAS = []
+
+for number, address in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(';')), start=1
+):
+    host, _, port = address.partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'}
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+if os.getenv('DB_REPLICA_TEST') == 'True':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        },
+        'replica_1': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db_replica.sqlite3',
+        }
+    }
+    DATABASE_REPLICAS = ['replica_1']
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+if os.getenv('CACHE_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.getenv('CACHE_LOCATION').split(';'),
+        }
+    }
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -114,12 +173,12 @@ DJOSER = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.LimitPageNumberPagination',
     'PAGE_SIZE': 6,
 }
 
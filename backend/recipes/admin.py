@@ -1,10 +1,10 @@
 from django.contrib import admin
 
 from .models import (Favorite, Ingredient, Recipe, RecipeIngredient, RecipeTag,
-                     ShoppingCart, Subscription, Tag)
+                     ShoppingCart, ShortLink, Subscription, Tag)
 
 
 @admin.register(Tag, Ingredient, Recipe, RecipeTag, RecipeIngredient,
-                Subscription, ShoppingCart, Favorite)
+                Subscription, ShoppingCart, Favorite, ShortLink)
 class FoodgramAdmin(admin.ModelAdmin):
     pass
@@ -0,0 +1,81 @@
+import bisect
+import re
+import threading
+
+from core.constants import RecipesConstants
+
+
+recipe_constants = RecipesConstants()
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_trigrams(value):
+    trigrams = set()
+    for word in re.findall(r'\w+', value.lower()):
+        word = f'  {word} '
+        trigrams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return trigrams
+
+
+def get_similarity(left, right):
+    if not left or not right:
+        return 0
+    return len(left & right) / len(left | right)
+
+
+class IngredientIndex:
+
+    def __init__(self, ingredients):
+        self.entries = sorted(
+            ((ingredient.name.lower(), ingredient)
+             for ingredient in ingredients),
+            key=lambda entry: entry[0]
+        )
+        self.keys = [key for key, _ in self.entries]
+        self.trigrams = [get_trigrams(key) for key in self.keys]
+
+    def search(self, query, limit):
+        query = query.lower()
+        query_trigrams = get_trigrams(query)
+        start = bisect.bisect_left(self.keys, query)
+        end = bisect.bisect_right(self.keys, query + '\uffff')
+        matches = [
+            self.get_match(0, position, query_trigrams)
+            for position in range(start, end)
+        ]
+        if len(matches) < limit:
+            for position, key in enumerate(self.keys):
+                if start <= position < end:
+                    continue
+                match = self.get_match(
+                    1 if query in key else 2, position, query_trigrams
+                )
+                if match[0] == 1 or (
+                    -match[1] >= recipe_constants.INGREDIENT_SIMILARITY
+                ):
+                    matches.append(match)
+        matches.sort(key=lambda match: match[:3])
+        return [ingredient for *_, ingredient in matches[:limit]]
+
+    def get_match(self, rank, position, query_trigrams):
+        key, ingredient = self.entries[position]
+        similarity = get_similarity(query_trigrams, self.trigrams[position])
+        return rank, -similarity, key, ingredient
+
+
+def get_index(queryset):
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = IngredientIndex(queryset.only(
+                'id', 'name', 'measurement_unit'
+            ))
+        return _index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
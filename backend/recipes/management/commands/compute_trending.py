@@ -0,0 +1,67 @@
+import heapq
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from core.constants import RecipesConstants
+from recipes.models import Favorite, ShoppingCart, TrendingRecipe
+from recipes.trending import trending_cache
+
+
+recipe_constants = RecipesConstants()
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт популярных рецептов с затуханием по времени'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=recipe_constants.TRENDING_WINDOW_DAYS
+        )
+        parser.add_argument(
+            '--half-life',
+            type=float,
+            default=recipe_constants.TRENDING_HALF_LIFE_HOURS,
+            help='Период полураспада веса события, в часах'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        since = now - timedelta(days=options['days'])
+        decay = math.log(2) / options['half_life']
+        scores = defaultdict(float)
+        for model, weight in (
+            (Favorite, recipe_constants.TRENDING_FAVORITE_WEIGHT),
+            (ShoppingCart, recipe_constants.TRENDING_SHOPPING_CART_WEIGHT),
+        ):
+            buckets = model.objects.filter(created_at__gte=since).values(
+                'recipe_id', hour=TruncHour('created_at')
+            ).annotate(total=Count('id')).order_by()
+            for bucket in buckets.iterator():
+                age = (now - bucket['hour']).total_seconds() / 3600
+                scores[bucket['recipe_id']] += (
+                    weight * bucket['total'] * math.exp(-decay * age)
+                )
+        top = heapq.nlargest(
+            recipe_constants.TRENDING_TABLE_SIZE,
+            scores.items(),
+            key=lambda item: (item[1], item[0])
+        )
+        with transaction.atomic():
+            TrendingRecipe.objects.all().delete()
+            TrendingRecipe.objects.bulk_create(
+                TrendingRecipe(recipe_id=recipe_id, rank=rank, score=score)
+                for rank, (recipe_id, score) in enumerate(top, start=1)
+            )
+            transaction.on_commit(trending_cache.invalidate)
+        self.stdout.write(self.style.SUCCESS(
+            f'Популярных рецептов: {len(top)} из {len(scores)}'
+        ))
@@ -0,0 +1,135 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from api.views import RecipeViewSet, UserSubscriptionsViewSet
+from recipes.models import (Favorite, RecipeIngredient, RecipeTag,
+                            ShoppingCart, Subscription, Tag)
+
+
+User = get_user_model()
+
+SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (\w+)(?! USING)(?:\s|$)'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Проверка планов основных запросов API на полное сканирование'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            help='id пользователя, от имени которого строятся запросы'
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Печатать планы запросов целиком'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in SCAN_PATTERNS:
+            raise CommandError(
+                f'База данных {connection.vendor} не поддерживается'
+            )
+        user = self.get_user(options['user'])
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for name, queryset in self.get_querysets(user):
+                plan = self.explain(queryset)
+                scans = sorted(set(
+                    SCAN_PATTERNS[connection.vendor].findall(plan)
+                ))
+                if options['verbose_plans']:
+                    self.stdout.write(f'{name}:\n{plan}\n')
+                if scans:
+                    failures.append(f'{name}: {", ".join(scans)}')
+                    self.stdout.write(self.style.ERROR(
+                        f'{name}: полное сканирование {", ".join(scans)}'
+                    ))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'{name}: OK'))
+        if failures:
+            raise CommandError(
+                'Запросы без подходящих индексов: ' + '; '.join(failures)
+            )
+
+    @staticmethod
+    def get_user(user_id):
+        users = User.objects.order_by('id')
+        user = (
+            users.filter(id=user_id).first() if user_id else users.first()
+        )
+        if user is None:
+            raise CommandError('В базе нет пользователей')
+        return user
+
+    @staticmethod
+    def explain(queryset):
+        if connection.vendor == 'postgresql':
+            return queryset.explain(analyze=True)
+        return queryset.explain()
+
+    @staticmethod
+    def get_view(viewset_class, user, params=None):
+        request = Request(RequestFactory().get('/', params or {}))
+        request.user = user
+        return viewset_class(
+            request=request, action='list', args=(), kwargs={},
+            format_kwarg=None
+        )
+
+    def get_recipes(self, user, params=None):
+        view = self.get_view(RecipeViewSet, user, params)
+        return view.filter_queryset(view.get_queryset())[:6]
+
+    def get_querysets(self, user):
+        recipe_ids = list(
+            self.get_recipes(user).values_list('id', flat=True)
+        )
+        tags = list(Tag.objects.values_list('slug', flat=True)[:2])
+        author = Subscription.objects.filter(user=user).values_list(
+            'subscription_id', flat=True
+        ).first() or user.id
+        subscriptions = self.get_view(
+            UserSubscriptionsViewSet, user, {'recipes_limit': 3}
+        )
+        return (
+            ('recipes', self.get_recipes(user)),
+            ('recipes_by_tags', self.get_recipes(user, {'tags': tags})),
+            ('recipes_by_author', self.get_recipes(
+                user, {'author': author}
+            )),
+            ('recipes_favorited', self.get_recipes(
+                user, {'is_favorited': 1}
+            )),
+            ('recipes_in_shopping_cart', self.get_recipes(
+                user, {'is_in_shopping_cart': 1}
+            )),
+            ('recipe_tags', RecipeTag.objects.filter(
+                recipe_id__in=recipe_ids
+            )),
+            ('recipe_ingredients', RecipeIngredient.objects.filter(
+                recipe_id__in=recipe_ids
+            ).select_related('ingredient')),
+            ('favorite_exists', Favorite.objects.filter(
+                user=user, recipe_id__in=recipe_ids
+            )),
+            ('shopping_cart_exists', ShoppingCart.objects.filter(
+                user=user, recipe_id__in=recipe_ids
+            )),
+            ('subscriptions', subscriptions.get_queryset()[:6]),
+            ('shopping_list', user.shopping_list.select_related(
+                'ingredient'
+            ).order_by('ingredient__name')),
+        )
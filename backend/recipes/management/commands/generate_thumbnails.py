@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.cache import get_profile_version, recipes_version
+from core.images import process_image
+from recipes.models import Recipe
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Создание миниатюр изображений рецептов и аватаров'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать существующие миниатюры'
+        )
+
+    def handle(self, *args, **options):
+        images = list(Recipe.objects.exclude(image='').values_list(
+            'image', 'author_id'
+        )) + list(User.objects.exclude(avatar='').exclude(
+            avatar__isnull=True
+        ).values_list('avatar', 'id'))
+        failed = 0
+        changed_users = set()
+        for name, user_id in images:
+            try:
+                if process_image(name, force=options['force']):
+                    changed_users.add(user_id)
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'{name}: {error}')
+        for user_id in changed_users:
+            get_profile_version(user_id).bump()
+        if changed_users:
+            recipes_version.bump()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {len(images) - failed}, '
+            f'с ошибками: {failed}'
+        ))
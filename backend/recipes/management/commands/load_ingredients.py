@@ -1,18 +1,124 @@
 import csv
-from django.core.management.base import BaseCommand
+import io
+import json
+import time
+from itertools import islice
 
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.cache import ingredient_catalogue
+from core.constants import RecipesConstants
 from foodgram import settings
+from recipes.autocomplete import reset_index
 from recipes.models import Ingredient
 
 
+recipe_constants = RecipesConstants()
+
+
 class Command(BaseCommand):
     help = 'Загрузка ингредиентов'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default=settings.BASE_DIR / 'data/ingredients.csv',
+            help='CSV (название, единица) или JSON-файл с ингредиентами'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной пачке'
+        )
+
     def handle(self, *args, **options):
-        file_path = settings.BASE_DIR / 'data/ingredients.csv'
-        with open(file_path, 'r', encoding='utf-8') as file:
-            for ingredient in csv.reader(file):
-                Ingredient.objects.update_or_create(
-                    name=ingredient[0],
-                    measurement_unit=ingredient[1]
-                )
+        started = time.monotonic()
+        self.read = self.invalid = 0
+        rows = self.deduplicate(self.read_rows(str(options['path'])))
+        before = Ingredient.objects.count()
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                self.copy_rows(rows)
+            else:
+                self.bulk_create_rows(rows, options['batch_size'])
+        inserted = Ingredient.objects.count() - before
+        reset_index()
+        ingredient_catalogue.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Прочитано строк: {self.read}, '
+            f'добавлено: {inserted}, '
+            f'пропущено существующих: {len(rows) - inserted}, '
+            f'повторов в файле: {self.read - self.invalid - len(rows)}, '
+            f'некорректных: {self.invalid}, '
+            f'время: {time.monotonic() - started:.2f} с'
+        ))
+
+    def read_rows(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                if path.endswith('.json'):
+                    records = (
+                        (record.get('name'), record.get('measurement_unit'))
+                        for record in json.load(file)
+                    )
+                else:
+                    records = csv.reader(file)
+                for record in records:
+                    self.read += 1
+                    try:
+                        name, measurement_unit = (
+                            value.strip() for value in record
+                        )
+                    except (AttributeError, ValueError):
+                        name = measurement_unit = None
+                    if (
+                        not name or not measurement_unit
+                        or len(name) > recipe_constants.INGREDIENT_NAME_LENGTH
+                        or len(measurement_unit) > (
+                            recipe_constants.INGREDIENT_MEASUREMENT_UNIT_LENGTH
+                        )
+                    ):
+                        self.invalid += 1
+                        continue
+                    yield name, measurement_unit
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не удалось прочитать {path}: {error}')
+
+    @staticmethod
+    def deduplicate(rows):
+        return list(dict.fromkeys(rows))
+
+    @staticmethod
+    def copy_rows(rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        table = Ingredient._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMPORARY TABLE ingredient_staging '
+                '(name text, measurement_unit text) ON COMMIT DROP'
+            )
+            cursor.copy_expert(
+                'COPY ingredient_staging (name, measurement_unit) '
+                'FROM STDIN WITH (FORMAT csv)',
+                buffer
+            )
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                'SELECT name, measurement_unit FROM ingredient_staging '
+                'ON CONFLICT (name, measurement_unit) DO NOTHING'
+            )
+
+    @staticmethod
+    def bulk_create_rows(rows, batch_size):
+        rows = iter(rows)
+        while batch := list(islice(rows, batch_size)):
+            Ingredient.objects.bulk_create(
+                (Ingredient(name=name, measurement_unit=measurement_unit)
+                 for name, measurement_unit in batch),
+                ignore_conflicts=True
+            )
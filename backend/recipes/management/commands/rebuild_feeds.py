@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from core.constants import RecipesConstants
+from recipes.models import FeedEntry, Subscription
+
+
+recipe_constants = RecipesConstants()
+
+
+class Command(BaseCommand):
+    help = 'Заполнение и обрезка лент подписок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--trim',
+            action='store_true',
+            help='Только обрезать ленты до максимальной длины'
+        )
+
+    def handle(self, *args, **options):
+        if not options['trim']:
+            subscriptions = Subscription.objects.values_list(
+                'user_id', 'subscription_id'
+            ).order_by()
+            for user_id, author_id in subscriptions.iterator():
+                FeedEntry.objects.backfill(user_id, author_id)
+            self.stdout.write(
+                f'Записей в лентах: {FeedEntry.objects.count()}'
+            )
+        user_ids = FeedEntry.objects.values('user').annotate(
+            total=Count('id')
+        ).filter(
+            total__gt=recipe_constants.FEED_MAX_LENGTH
+        ).values_list('user', flat=True).order_by()
+        trimmed = 0
+        for user_id in user_ids.iterator():
+            FeedEntry.objects.trim(user_id)
+            trimmed += 1
+        self.stdout.write(self.style.SUCCESS(f'Обрезано лент: {trimmed}'))
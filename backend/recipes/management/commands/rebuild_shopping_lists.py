@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Sum
+
+from recipes.models import RecipeIngredient, ShoppingListItem
+
+
+class Command(BaseCommand):
+    help = 'Пересборка и проверка списков покупок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только сверить списки покупок с корзинами'
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            self.rebuild()
+        mismatches = self.check_totals()
+        if mismatches:
+            raise CommandError(
+                f'Расхождений в списках покупок: {mismatches}'
+            )
+        self.stdout.write(self.style.SUCCESS('Списки покупок актуальны'))
+
+    @staticmethod
+    def get_live_totals():
+        return {
+            (item['user_id'], item['ingredient_id']): item['total_amount']
+            for item in RecipeIngredient.objects.filter(
+                recipe__shoppingcarts__isnull=False
+            ).values(
+                'ingredient_id',
+                user_id=F('recipe__shoppingcarts__user')
+            ).annotate(
+                total_amount=Sum('amount')
+            ).order_by().iterator()
+        }
+
+    def rebuild(self):
+        totals = self.get_live_totals()
+        with transaction.atomic():
+            ShoppingListItem.objects.all().delete()
+            ShoppingListItem.objects.bulk_create(
+                (ShoppingListItem(
+                    user_id=user_id,
+                    ingredient_id=ingredient_id,
+                    total_amount=total_amount
+                ) for (user_id, ingredient_id), total_amount
+                    in totals.items()),
+                batch_size=1000
+            )
+        self.stdout.write(f'Записано позиций: {len(totals)}')
+
+    def check_totals(self):
+        totals = self.get_live_totals()
+        stored = {
+            (item.user_id, item.ingredient_id): item.total_amount
+            for item in ShoppingListItem.objects.iterator()
+        }
+        return sum(
+            1 for key in totals.keys() | stored.keys()
+            if totals.get(key) != stored.get(key)
+        )
@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import (Count, F, IntegerField, OuterRef, Q,
+                              Subquery)
+from django.db.models.functions import Coalesce
+
+from recipes.models import Favorite, Recipe, ShoppingCart, Subscription
+
+
+User = get_user_model()
+
+COUNTERS = (
+    (Recipe, (
+        ('favorites_count', Favorite, 'recipe'),
+        ('in_carts_count', ShoppingCart, 'recipe'),
+    )),
+    (User, (
+        ('recipes_count', Recipe, 'author'),
+        ('subscribers_count', Subscription, 'subscription'),
+    )),
+)
+
+
+def count_related(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+                field
+            ).annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+    help = 'Сверка и исправление счётчиков рецептов и пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только найти расхождения, не исправляя их'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model, counters in COUNTERS:
+            fixed = self.reconcile(
+                model, counters, options['check'], options['batch_size']
+            )
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: '
+                f'{"расхождений" if options["check"] else "исправлено"} '
+                f'{fixed}'
+            )
+
+    def reconcile(self, model, counters, check, batch_size):
+        fields = [field for field, _, _ in counters]
+        mismatched = model.objects.annotate(**{
+            f'actual_{field}': count_related(related_model, related_field)
+            for field, related_model, related_field in counters
+        }).filter(Q(*(
+            ~Q(**{field: F(f'actual_{field}')}) for field in fields
+        ), _connector=Q.OR)).values_list(
+            'pk', *(f'actual_{field}' for field in fields)
+        ).order_by()
+        objects = [
+            model(pk=row[0], **dict(zip(fields, row[1:])))
+            for row in mismatched.iterator()
+        ]
+        if objects and not check:
+            model.objects.bulk_update(objects, fields, batch_size=batch_size)
+        return len(objects)
@@ -0,0 +1,188 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import ingredient_catalogue, tag_catalogue
+from recipes.autocomplete import reset_index
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            RecipeTag, ShoppingCart, Subscription, Tag)
+
+
+User = get_user_model()
+
+SEED_PASSWORD = 'seed-password'
+
+
+class Command(BaseCommand):
+    help = 'Заполнение базы синтетическими данными для нагрузочных тестов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--tags', type=int, default=10)
+        parser.add_argument(
+            '--ingredients',
+            type=int,
+            default=500,
+            help='Сколько ингредиентов создать, если каталог пуст'
+        )
+        parser.add_argument('--favorites', type=int, default=20,
+                            help='Среднее число избранных на пользователя')
+        parser.add_argument('--carts', type=int, default=5,
+                            help='Среднее число рецептов в корзине')
+        parser.add_argument('--subscriptions', type=int, default=10,
+                            help='Среднее число подписок на пользователя')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        prefix = f'seed{int(time.time())}'
+        with transaction.atomic():
+            tags = self.create_tags(prefix, options['tags'])
+            ingredient_ids = self.get_ingredient_ids(
+                prefix, options['ingredients']
+            )
+            user_ids = self.create_users(prefix, options['users'])
+            recipe_ids = self.create_recipes(
+                prefix, options['recipes'], user_ids, tags, ingredient_ids
+            )
+            self.create_relations(
+                Favorite, 'recipe', user_ids, recipe_ids,
+                options['favorites']
+            )
+            self.create_relations(
+                ShoppingCart, 'recipe', user_ids, recipe_ids,
+                options['carts']
+            )
+            self.create_relations(
+                Subscription, 'subscription', user_ids, user_ids,
+                options['subscriptions']
+            )
+        reset_index()
+        ingredient_catalogue.invalidate()
+        tag_catalogue.invalidate()
+        call_command('rebuild_shopping_lists', stdout=self.stdout)
+        call_command('reconcile_counters', stdout=self.stdout)
+        call_command('rebuild_feeds', stdout=self.stdout)
+        call_command('compute_trending', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные созданы за {time.monotonic() - started:.1f} с, '
+            f'пароль пользователей: {SEED_PASSWORD}'
+        ))
+
+    def get_weights(self, count):
+        return [self.random.paretovariate(1.2) for _ in range(count)]
+
+    def create_tags(self, prefix, count):
+        Tag.objects.bulk_create(
+            (Tag(name=f'Тег {number}', slug=f'{prefix}-{number}')
+             for number in range(count)),
+            batch_size=self.batch_size
+        )
+        return list(Tag.objects.filter(slug__startswith=f'{prefix}-'))
+
+    def get_ingredient_ids(self, prefix, count):
+        if not Ingredient.objects.exists():
+            Ingredient.objects.bulk_create(
+                (Ingredient(
+                    name=f'{prefix} ингредиент {number}',
+                    measurement_unit=self.random.choice(('г', 'мл', 'шт.'))
+                ) for number in range(count)),
+                batch_size=self.batch_size
+            )
+        return list(Ingredient.objects.values_list('id', flat=True))
+
+    def create_users(self, prefix, count):
+        password = make_password(SEED_PASSWORD)
+        User.objects.bulk_create(
+            (User(
+                email=f'{prefix}-{number}@example.com',
+                username=f'{prefix}-{number}',
+                first_name='Имя',
+                last_name='Фамилия',
+                password=password
+            ) for number in range(count)),
+            batch_size=self.batch_size
+        )
+        return list(User.objects.filter(
+            username__startswith=f'{prefix}-'
+        ).values_list('id', flat=True))
+
+    def create_recipes(self, prefix, count, user_ids, tags, ingredient_ids):
+        authors = self.random.choices(
+            user_ids, weights=self.get_weights(len(user_ids)), k=count
+        )
+        Recipe.objects.bulk_create(
+            (Recipe(
+                author_id=author_id,
+                name=f'{prefix} рецепт {number}',
+                image='recipes/images/seed.png',
+                text='Синтетический рецепт для нагрузочного тестирования.',
+                cooking_time=self.random.randint(5, 180)
+            ) for number, author_id in enumerate(authors)),
+            batch_size=self.batch_size
+        )
+        recipes = list(Recipe.objects.filter(
+            name__startswith=f'{prefix} рецепт '
+        ).only('id').order_by('id'))
+        now = timezone.now()
+        for recipe in recipes:
+            recipe.created_at = now - timedelta(
+                minutes=self.random.randint(0, 365 * 24 * 60)
+            )
+        Recipe.objects.bulk_update(
+            recipes, ['created_at'], batch_size=self.batch_size
+        )
+        tag_weights = self.get_weights(len(tags))
+        RecipeTag.objects.bulk_create(
+            (RecipeTag(recipe_id=recipe.id, tag=tag)
+             for recipe in recipes
+             for tag in set(self.random.choices(
+                 tags, weights=tag_weights, k=self.random.randint(1, 3)
+             ))),
+            batch_size=self.batch_size
+        )
+        ingredient_weights = self.get_weights(len(ingredient_ids))
+        RecipeIngredient.objects.bulk_create(
+            (RecipeIngredient(recipe_id=recipe.id,
+                              ingredient_id=ingredient_id,
+                              amount=self.random.randint(1, 500))
+             for recipe in recipes
+             for ingredient_id in set(self.random.choices(
+                 ingredient_ids, weights=ingredient_weights,
+                 k=self.random.randint(2, 12)
+             ))),
+            batch_size=self.batch_size
+        )
+        return [recipe.id for recipe in recipes]
+
+    def create_relations(self, model, target, user_ids, target_ids, average):
+        weights = self.get_weights(len(target_ids))
+        objects = []
+        for user_id in user_ids:
+            count = min(
+                int(self.random.expovariate(1 / average)) if average else 0,
+                len(target_ids)
+            )
+            for target_id in set(self.random.choices(
+                target_ids, weights=weights, k=count
+            )):
+                if model is Subscription and target_id == user_id:
+                    continue
+                objects.append(model(
+                    user_id=user_id, **{f'{target}_id': target_id}
+                ))
+        model.objects.bulk_create(
+            objects, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {len(objects)}')
@@ -0,0 +1,156 @@
+# Generated by Django 3.2.3 on 2026-10-18 03:14
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+FORWARD_SQL = (
+    """
+    CREATE OR REPLACE FUNCTION recipes_search_document(
+        bigint, text, text
+    ) RETURNS tsvector LANGUAGE sql STABLE AS $$
+        SELECT setweight(to_tsvector('russian', coalesce($2, '')), 'A')
+            || setweight(to_tsvector('russian', coalesce((
+                SELECT string_agg(ingredient.name, ' ')
+                FROM recipes_recipeingredient AS item
+                JOIN recipes_ingredient AS ingredient
+                    ON ingredient.id = item.ingredient_id
+                WHERE item.recipe_id = $1
+            ), '')), 'B')
+            || setweight(to_tsvector('russian', coalesce($3, '')), 'C')
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION recipes_refresh_search(bigint[])
+    RETURNS void LANGUAGE sql AS $$
+        UPDATE recipes_recipe
+        SET search_vector = recipes_search_document(id, name, text)
+        WHERE id = ANY($1)
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION recipes_recipe_search_trigger()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := recipes_search_document(
+            NEW.id, NEW.name, NEW.text
+        );
+        RETURN NEW;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION recipes_recipeingredient_search_trigger()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM recipes_refresh_search(
+                ARRAY(SELECT DISTINCT recipe_id FROM new_rows)
+            );
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM recipes_refresh_search(
+                ARRAY(SELECT DISTINCT recipe_id FROM old_rows)
+            );
+        ELSE
+            PERFORM recipes_refresh_search(ARRAY(
+                SELECT new_rows.recipe_id
+                FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+                WHERE old_rows.ingredient_id <> new_rows.ingredient_id
+                    OR old_rows.recipe_id <> new_rows.recipe_id
+                UNION
+                SELECT old_rows.recipe_id
+                FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+                WHERE old_rows.recipe_id <> new_rows.recipe_id
+            ));
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION recipes_ingredient_search_trigger()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM recipes_refresh_search(ARRAY(
+            SELECT DISTINCT item.recipe_id
+            FROM recipes_recipeingredient AS item
+            JOIN new_rows ON new_rows.id = item.ingredient_id
+            JOIN old_rows ON old_rows.id = new_rows.id
+            WHERE old_rows.name IS DISTINCT FROM new_rows.name
+        ));
+        RETURN NULL;
+    END
+    $$
+    """,
+    'CREATE TRIGGER recipes_recipe_search '
+    'BEFORE INSERT OR UPDATE OF name, text ON recipes_recipe '
+    'FOR EACH ROW EXECUTE FUNCTION recipes_recipe_search_trigger()',
+    'CREATE TRIGGER recipes_recipeingredient_search_insert '
+    'AFTER INSERT ON recipes_recipeingredient '
+    'REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT '
+    'EXECUTE FUNCTION recipes_recipeingredient_search_trigger()',
+    'CREATE TRIGGER recipes_recipeingredient_search_delete '
+    'AFTER DELETE ON recipes_recipeingredient '
+    'REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT '
+    'EXECUTE FUNCTION recipes_recipeingredient_search_trigger()',
+    'CREATE TRIGGER recipes_recipeingredient_search_update '
+    'AFTER UPDATE ON recipes_recipeingredient '
+    'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+    'FOR EACH STATEMENT '
+    'EXECUTE FUNCTION recipes_recipeingredient_search_trigger()',
+    'CREATE TRIGGER recipes_ingredient_search_update '
+    'AFTER UPDATE ON recipes_ingredient '
+    'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+    'FOR EACH STATEMENT '
+    'EXECUTE FUNCTION recipes_ingredient_search_trigger()',
+    'UPDATE recipes_recipe '
+    'SET search_vector = recipes_search_document(id, name, text)',
+    'CREATE INDEX IF NOT EXISTS recipes_recipe_search_vector_idx '
+    'ON recipes_recipe USING gin (search_vector)',
+)
+
+BACKWARD_SQL = (
+    'DROP INDEX IF EXISTS recipes_recipe_search_vector_idx',
+    'DROP TRIGGER IF EXISTS recipes_ingredient_search_update '
+    'ON recipes_ingredient',
+    'DROP TRIGGER IF EXISTS recipes_recipeingredient_search_update '
+    'ON recipes_recipeingredient',
+    'DROP TRIGGER IF EXISTS recipes_recipeingredient_search_delete '
+    'ON recipes_recipeingredient',
+    'DROP TRIGGER IF EXISTS recipes_recipeingredient_search_insert '
+    'ON recipes_recipeingredient',
+    'DROP TRIGGER IF EXISTS recipes_recipe_search ON recipes_recipe',
+    'DROP FUNCTION IF EXISTS recipes_ingredient_search_trigger()',
+    'DROP FUNCTION IF EXISTS recipes_recipeingredient_search_trigger()',
+    'DROP FUNCTION IF EXISTS recipes_recipe_search_trigger()',
+    'DROP FUNCTION IF EXISTS recipes_refresh_search(bigint[])',
+    'DROP FUNCTION IF EXISTS recipes_search_document(bigint, text, text)',
+)
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_shortlink'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(
+            run_postgresql(FORWARD_SQL),
+            run_postgresql(BACKWARD_SQL)
+        ),
+    ]
@@ -1,8 +1,28 @@
+import heapq
+from itertools import islice
+
 from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist
 from django.core.validators import MinValueValidator
-from django.db import models
-
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVectorField,
+                                            TrigramSimilarity)
+from django.db import (IntegrityError, connections, models, router,
+                       transaction)
+from django.db.models import (BooleanField, Case, Exists, F, FloatField,
+                              IntegerField, OuterRef, Prefetch, Q, Subquery,
+                              Value, When, Window)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Lower, Now, RowNumber
+from django.utils import timezone
+
+from .autocomplete import get_index
+from .search import get_index as get_search_index
+from .shortlinks import generate_code
+from .trending import trending_cache
+from core.cache import get_relations_version
 from core.constants import RecipesConstants
+from core.models import CounterFieldsMixin
 
 
 User = get_user_model()
@@ -29,6 +49,29 @@ class Tag(models.Model):
         return self.name
 
 
+class IngredientQuerySet(models.QuerySet):
+
+    def autocomplete(self, query, limit):
+        if connections[self.db].vendor != 'postgresql':
+            return get_index(self).search(query, limit)
+        query = query.lower()
+        return self.annotate(
+            name_lower=Lower('name')
+        ).filter(
+            models.Q(name_lower__startswith=query)
+            | models.Q(name_lower__contains=query)
+            | models.Q(name_lower__trigram_similar=query)
+        ).annotate(
+            rank=Case(
+                When(name_lower__startswith=query, then=Value(0)),
+                When(name_lower__contains=query, then=Value(1)),
+                default=Value(2),
+                output_field=IntegerField()
+            ),
+            similarity=TrigramSimilarity('name_lower', query)
+        ).order_by('rank', '-similarity', 'name_lower')[:limit]
+
+
 class Ingredient(models.Model):
     name = models.CharField(
         max_length=recipe_constants.INGREDIENT_NAME_LENGTH,
@@ -39,15 +82,128 @@ class Ingredient(models.Model):
         verbose_name='Единица измерения'
     )
 
+    objects = IngredientQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'measurement_unit'],
+                name='unique_ingredient_name_measurement_unit'
+            )
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Recipe(models.Model):
+class RecipeQuerySet(models.QuerySet):
+
+    def trending(self):
+        recipe_ids = trending_cache.get()
+        return self.filter(pk__in=recipe_ids).annotate(
+            trending_rank=Case(
+                *(When(pk=recipe_id, then=Value(position))
+                  for position, recipe_id in enumerate(recipe_ids)),
+                default=Value(None),
+                output_field=IntegerField()
+            )
+        ).order_by('trending_rank')
+
+    def with_tags(self, tag_ids):
+        return self.filter(Exists(RecipeTag.objects.filter(
+            recipe=OuterRef('pk'), tag_id__in=tag_ids
+        )))
+
+    def search(self, query):
+        if not query.strip():
+            return self
+        if connections[self.db].vendor != 'postgresql':
+            recipe_ids = get_search_index(
+                self.model.objects.all(), RecipeIngredient.objects.all()
+            ).search(query)
+            allowed = set(self.filter(pk__in=recipe_ids).values_list(
+                'pk', flat=True
+            ))
+            recipe_ids = [
+                recipe_id for recipe_id in recipe_ids if recipe_id in allowed
+            ][:recipe_constants.SEARCH_CANDIDATES]
+            return self.filter(pk__in=recipe_ids).annotate(
+                search_rank=Case(
+                    *(When(pk=recipe_id, then=Value(-position))
+                      for position, recipe_id in enumerate(recipe_ids)),
+                    default=Value(None),
+                    output_field=IntegerField()
+                )
+            ).order_by('-search_rank')
+        query = SearchQuery(
+            query,
+            config=recipe_constants.SEARCH_CONFIG,
+            search_type='websearch'
+        )
+        candidates = self.filter(
+            search_vector=query
+        ).order_by('-created_at', '-id').values('pk')[
+            :recipe_constants.SEARCH_CANDIDATES
+        ]
+        return self.filter(pk__in=Subquery(candidates)).annotate(
+            search_rank=Cast(
+                SearchRank(F('search_vector'), query), FloatField()
+            )
+        ).order_by('-search_rank', '-created_at', '-id')
+
+    def with_user_flags(self, user):
+        if user.is_anonymous:
+            return self.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField())
+            )
+        return self.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef('pk'))
+            )
+        )
+
+    def for_read(self, user):
+        if user.is_anonymous:
+            authors = User.objects.annotate(
+                is_subscribed=Value(False, output_field=BooleanField())
+            )
+        else:
+            authors = User.objects.annotate(
+                is_subscribed=Exists(Subscription.objects.filter(
+                    user=user, subscription=OuterRef('pk')
+                ))
+            )
+        return self.with_user_flags(user).prefetch_related(
+            Prefetch('author', queryset=authors),
+            Prefetch('tags', queryset=Tag.objects.all()),
+            Prefetch(
+                'recipe_ingredients',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            )
+        )
+
+    def limit_per_author(self, limit):
+        ranked = self.annotate(
+            recipe_rank=Window(
+                expression=RowNumber(),
+                partition_by=F('author'),
+                order_by=F('id').desc()
+            )
+        ).order_by().values('id', 'recipe_rank')
+        sql, params = ranked.query.sql_with_params()
+        return self.model.objects.filter(pk__in=RawSQL(
+            f'SELECT id FROM ({sql}) AS ranked WHERE recipe_rank <= %s',
+            (*params, limit)
+        ))
+
+
+class Recipe(CounterFieldsMixin, models.Model):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -79,14 +235,61 @@ class Recipe(models.Model):
         validators=[MinValueValidator(1)],
         verbose_name='Время приготовления'
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата публикации'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Поисковый вектор'
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В избранном'
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В списках покупок'
+    )
+
+    counter_fields = ('favorites_count', 'in_carts_count')
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        ordering = ('-created_at', '-id')
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='recipe_created_at_idx'
+            ),
+            models.Index(
+                fields=['author', '-created_at'],
+                name='recipe_author_created_at_idx'
+            ),
+            models.Index(
+                fields=['-favorites_count', '-created_at', '-id'],
+                name='recipe_favorites_count_idx'
+            )
+        ]
 
     def __str__(self):
         return self.name
 
+    def get_ingredient_amounts(self):
+        return dict(
+            self.recipe_ingredients.values_list('ingredient_id', 'amount')
+        )
+
 
 class RecipeIngredient(models.Model):
     recipe = models.ForeignKey(
@@ -142,11 +345,174 @@ class RecipeTag(models.Model):
                 fields=['recipe', 'tag'],
                 name='unique_recipe_tag')
         ]
+        indexes = [
+            models.Index(
+                fields=['tag', 'recipe'],
+                name='recipetag_tag_recipe_idx'
+            )
+        ]
 
     def __str__(self):
         return (f'{self.recipe.name} - {self.tag.name}')
 
 
+class UserRelationQuerySet(models.QuerySet):
+    target_field = 'recipe'
+    counter_field = None
+
+    def get_sql_parts(self):
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        target = self.model._meta.get_field(self.target_field)
+        return connection, quote, target
+
+    def get_insert_values(self, connection):
+        try:
+            field = self.model._meta.get_field('created_at')
+        except FieldDoesNotExist:
+            return {}
+        return {
+            field.column: connection.ops.adapt_datetimefield_value(
+                timezone.now()
+            )
+        }
+
+    def add(self, user_id, target_id):
+        connection, quote, target = self.get_sql_parts()
+        extra = self.get_insert_values(connection)
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'INSERT INTO {table} ({user}, {target}{columns}) '
+                    'SELECT %s, {pk}{values} FROM {target_table} '
+                    'WHERE {pk} = %s '
+                    'ON CONFLICT DO NOTHING'.format(
+                        table=quote(self.model._meta.db_table),
+                        user=quote(
+                            self.model._meta.get_field('user').column
+                        ),
+                        target=quote(target.column),
+                        columns=''.join(
+                            f', {quote(column)}' for column in extra
+                        ),
+                        values=', %s' * len(extra),
+                        pk=quote(target.related_model._meta.pk.column),
+                        target_table=quote(
+                            target.related_model._meta.db_table
+                        )
+                    ),
+                    [user_id, *extra.values(), target_id]
+                )
+                created = cursor.rowcount == 1
+            if created:
+                self.update_counter(target, target_id, 1)
+                self.on_added(user_id, target_id)
+        if created:
+            self.on_change(user_id, connection.alias)
+        return created
+
+    def remove(self, user_id, target_id):
+        connection, quote, target = self.get_sql_parts()
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'DELETE FROM {table} '
+                    'WHERE {user} = %s AND {target} = %s'.format(
+                        table=quote(self.model._meta.db_table),
+                        user=quote(
+                            self.model._meta.get_field('user').column
+                        ),
+                        target=quote(target.column)
+                    ),
+                    [user_id, target_id]
+                )
+                deleted = cursor.rowcount > 0
+            if deleted:
+                self.update_counter(target, target_id, -1)
+                self.on_removed(user_id, target_id)
+        if deleted:
+            self.on_change(user_id, connection.alias)
+        return deleted
+
+    def get_counter_values(self, delta):
+        return {self.counter_field: F(self.counter_field) + delta}
+
+    def update_counter(self, target, target_id, delta):
+        if self.counter_field is None:
+            return
+        targets = target.related_model._default_manager.filter(pk=target_id)
+        if delta < 0:
+            targets = targets.filter(**{f'{self.counter_field}__gt': 0})
+        targets.update(**self.get_counter_values(delta))
+
+    def forget_user(self, user_id):
+        if self.counter_field is None:
+            return
+        target = self.model._meta.get_field(self.target_field)
+        target.related_model._default_manager.filter(
+            pk__in=self.filter(user_id=user_id).values(target.attname),
+            **{f'{self.counter_field}__gt': 0}
+        ).update(**self.get_counter_values(-1))
+
+    def on_added(self, user_id, target_id):
+        pass
+
+    def on_removed(self, user_id, target_id):
+        pass
+
+    @staticmethod
+    def on_change(user_id, using):
+        transaction.on_commit(
+            get_relations_version(user_id).bump, using=using
+        )
+
+
+class RecipeRelationQuerySet(UserRelationQuerySet):
+
+    def get_counter_values(self, delta):
+        return {**super().get_counter_values(delta), 'updated_at': Now()}
+
+
+class FavoriteQuerySet(RecipeRelationQuerySet):
+    counter_field = 'favorites_count'
+
+
+class ShoppingCartQuerySet(RecipeRelationQuerySet):
+    counter_field = 'in_carts_count'
+
+    def on_added(self, user_id, target_id):
+        ShoppingListItem.objects.add_recipe([user_id], Recipe(pk=target_id))
+
+    def on_removed(self, user_id, target_id):
+        ShoppingListItem.objects.remove_recipe(
+            [user_id], Recipe(pk=target_id)
+        )
+
+
+class SubscriptionQuerySet(UserRelationQuerySet):
+    target_field = 'subscription'
+    counter_field = 'subscribers_count'
+
+    def on_added(self, user_id, target_id):
+        FeedEntry.objects.backfill(user_id, target_id)
+
+    def on_removed(self, user_id, target_id):
+        FeedEntry.objects.prune(user_id, target_id)
+        if User.objects.filter(
+            pk=target_id,
+            subscribers_count=recipe_constants.FEED_FANOUT_MAX_SUBSCRIBERS - 1
+        ).exists():
+            FeedEntry.objects.fan_out_author(target_id)
+
+    def forget_user(self, user_id):
+        super().forget_user(user_id)
+        for author_id in User.objects.filter(
+            pk__in=self.filter(user_id=user_id).values('subscription_id'),
+            subscribers_count=recipe_constants.FEED_FANOUT_MAX_SUBSCRIBERS - 1
+        ).values_list('pk', flat=True):
+            FeedEntry.objects.fan_out_author(author_id)
+
+
 class Subscription(models.Model):
     user = models.ForeignKey(
         User,
@@ -160,6 +526,8 @@ class Subscription(models.Model):
         verbose_name='Подписка'
     )
 
+    objects = SubscriptionQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
@@ -169,6 +537,12 @@ class Subscription(models.Model):
                 name='unique_user_subscription'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['subscription', 'user'],
+                name='subscription_author_user_idx'
+            )
+        ]
 
     def __str__(self):
         return (f'Пользователь {self.user.username}'
@@ -188,6 +562,12 @@ class Favorite(models.Model):
         related_name='favorites',
         verbose_name='Избранное'
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата добавления'
+    )
+
+    objects = FavoriteQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт в избранном'
@@ -198,6 +578,16 @@ class Favorite(models.Model):
                 name='unique_favorite_user_recipe'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['recipe', 'user'],
+                name='favorite_recipe_user_idx'
+            ),
+            models.Index(
+                fields=['created_at'],
+                name='favorite_created_at_idx'
+            )
+        ]
 
     def __str__(self):
         return (f'Рецепт {self.recipe.name}'
@@ -217,6 +607,12 @@ class ShoppingCart(models.Model):
         related_name='shoppingcarts',
         verbose_name='Рецепт в списке покупок'
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата добавления'
+    )
+
+    objects = ShoppingCartQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт в списке покупок'
@@ -227,7 +623,365 @@ class ShoppingCart(models.Model):
                 name='unique_shoppingcart_user_recipe'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['recipe', 'user'],
+                name='shoppingcart_recipe_user_idx'
+            ),
+            models.Index(
+                fields=['created_at'],
+                name='shoppingcart_created_at_idx'
+            )
+        ]
 
     def __str__(self):
         return (f'Рецепт {self.recipe.name}'
                 f'в корзине {self.user.username}')
+
+
+class ShoppingListItemQuerySet(models.QuerySet):
+
+    def apply_delta(self, user_ids, amounts):
+        rows = sorted(
+            (user_id, ingredient_id, amount)
+            for user_id in user_ids
+            for ingredient_id, amount in amounts.items() if amount
+        )
+        if not rows:
+            return
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        batch_size = recipe_constants.SHOPPING_LIST_UPSERT_BATCH_SIZE
+        with transaction.atomic(using=connection.alias, savepoint=False):
+            with connection.cursor() as cursor:
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    cursor.execute(
+                        'INSERT INTO {table} '
+                        '(user_id, ingredient_id, total_amount) '
+                        'VALUES {values} '
+                        'ON CONFLICT (user_id, ingredient_id) DO UPDATE '
+                        'SET total_amount = {table}.total_amount '
+                        '+ EXCLUDED.total_amount'.format(
+                            table=table,
+                            values=', '.join(['(%s, %s, %s)'] * len(batch))
+                        ),
+                        [value for row in batch for value in row]
+                    )
+            if any(amount < 0 for _, _, amount in rows):
+                self.filter(
+                    user_id__in=user_ids,
+                    ingredient_id__in=amounts,
+                    total_amount__lte=0
+                ).delete()
+
+    def add_recipe(self, user_ids, recipe, amounts=None):
+        self.apply_delta(user_ids, amounts or recipe.get_ingredient_amounts())
+
+    def remove_recipe(self, user_ids, recipe, amounts=None):
+        self.apply_delta(user_ids, {
+            ingredient_id: -amount
+            for ingredient_id, amount in (
+                amounts or recipe.get_ingredient_amounts()
+            ).items()
+        })
+
+
+class ShoppingListItem(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_list',
+        verbose_name='Пользователь'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_list_items',
+        verbose_name='Ингредиент'
+    )
+    total_amount = models.IntegerField(
+        verbose_name='Количество'
+    )
+
+    objects = ShoppingListItemQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Позиция списка покупок'
+        verbose_name_plural = 'Списки покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_shoppinglist_user_ingredient'
+            )
+        ]
+
+    def __str__(self):
+        return (f'{self.ingredient.name} - {self.total_amount}'
+                f'{self.ingredient.measurement_unit}')
+
+
+class ShortLinkQuerySet(models.QuerySet):
+
+    def get_or_create_for(self, recipe_id):
+        link = self.filter(recipe_id=recipe_id).first()
+        for _ in range(recipe_constants.SHORT_LINK_ATTEMPTS):
+            if link is not None:
+                return link
+            try:
+                with transaction.atomic():
+                    return self.create(
+                        recipe_id=recipe_id, code=generate_code()
+                    )
+            except IntegrityError:
+                link = self.filter(recipe_id=recipe_id).first()
+        raise IntegrityError('Не удалось подобрать свободный код ссылки')
+
+
+class ShortLink(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='short_link',
+        verbose_name='Рецепт'
+    )
+    code = models.CharField(
+        max_length=recipe_constants.SHORT_LINK_MAX_LENGTH,
+        unique=True,
+        verbose_name='Код'
+    )
+    hits = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Переходы'
+    )
+
+    objects = ShortLinkQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Короткая ссылка'
+        verbose_name_plural = 'Короткие ссылки'
+
+    def __str__(self):
+        return self.code
+
+
+class FeedEntryQuerySet(models.QuerySet):
+
+    def get_sql_parts(self):
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        return connection, {
+            'feed': quote(self.model._meta.db_table),
+            'recipe': quote(Recipe._meta.db_table),
+            'subscription': quote(Subscription._meta.db_table),
+            'user': quote(User._meta.db_table),
+        }
+
+    def fan_out(self, recipe):
+        connection, tables = self.get_sql_parts()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO {feed} (user_id, recipe_id, author_id, '
+                'created_at) '
+                'SELECT subscription.user_id, recipe.id, recipe.author_id, '
+                'recipe.created_at '
+                'FROM {subscription} AS subscription '
+                'JOIN {recipe} AS recipe '
+                'ON recipe.author_id = subscription.subscription_id '
+                'WHERE recipe.id = %s AND EXISTS ('
+                'SELECT 1 FROM {user} AS author '
+                'WHERE author.id = recipe.author_id '
+                'AND author.subscribers_count < %s) '
+                'ON CONFLICT DO NOTHING'.format(**tables),
+                [recipe.pk, recipe_constants.FEED_FANOUT_MAX_SUBSCRIBERS]
+            )
+            fanned_out = cursor.rowcount > 0
+        if fanned_out:
+            self.trim_subscribers(recipe.author_id)
+
+    def fan_out_author(self, author_id):
+        connection, tables = self.get_sql_parts()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO {feed} (user_id, recipe_id, author_id, '
+                'created_at) '
+                'SELECT subscription.user_id, recipe.id, recipe.author_id, '
+                'recipe.created_at '
+                'FROM {subscription} AS subscription '
+                'JOIN (SELECT id, author_id, created_at FROM {recipe} '
+                'WHERE author_id = %s '
+                'ORDER BY created_at DESC, id DESC LIMIT %s) AS recipe '
+                'ON recipe.author_id = subscription.subscription_id '
+                'WHERE subscription.subscription_id = %s '
+                'ON CONFLICT DO NOTHING'.format(**tables),
+                [author_id, recipe_constants.FEED_MAX_LENGTH, author_id]
+            )
+        self.trim_subscribers(author_id)
+
+    def backfill(self, user_id, author_id):
+        connection, tables = self.get_sql_parts()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO {feed} (user_id, recipe_id, author_id, '
+                'created_at) '
+                'SELECT %s, recipe.id, recipe.author_id, recipe.created_at '
+                'FROM {recipe} AS recipe '
+                'WHERE recipe.author_id = %s AND EXISTS ('
+                'SELECT 1 FROM {user} AS author '
+                'WHERE author.id = %s AND author.subscribers_count < %s) '
+                'ORDER BY recipe.created_at DESC, recipe.id DESC LIMIT %s '
+                'ON CONFLICT DO NOTHING'.format(**tables),
+                [user_id, author_id, author_id,
+                 recipe_constants.FEED_FANOUT_MAX_SUBSCRIBERS,
+                 recipe_constants.FEED_MAX_LENGTH]
+            )
+            backfilled = cursor.rowcount > 0
+        if backfilled:
+            self.trim(user_id)
+
+    def prune(self, user_id, author_id):
+        self.filter(user_id=user_id, author_id=author_id).delete()
+
+    def trim(self, user_id):
+        boundary = self.filter(user_id=user_id).order_by(
+            '-created_at', '-recipe_id'
+        ).values_list('created_at', 'recipe_id')[
+            recipe_constants.FEED_MAX_LENGTH:
+            recipe_constants.FEED_MAX_LENGTH + 1
+        ].first()
+        if boundary is None:
+            return
+        created_at, recipe_id = boundary
+        self.filter(
+            Q(created_at__lt=created_at)
+            | Q(created_at=created_at, recipe_id__lte=recipe_id),
+            user_id=user_id
+        ).delete()
+
+    def trim_subscribers(self, author_id):
+        connection, tables = self.get_sql_parts()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM {feed} WHERE id IN ('
+                'SELECT id FROM (SELECT entry.id, ROW_NUMBER() OVER ('
+                'PARTITION BY entry.user_id '
+                'ORDER BY entry.created_at DESC, entry.recipe_id DESC'
+                ') AS position '
+                'FROM {feed} AS entry '
+                'JOIN {subscription} AS subscription '
+                'ON subscription.user_id = entry.user_id '
+                'WHERE subscription.subscription_id = %s) AS ranked '
+                'WHERE position > %s)'.format(**tables),
+                [author_id, recipe_constants.FEED_MAX_LENGTH]
+            )
+
+    def get_pulled_authors(self, user):
+        return list(Subscription.objects.filter(
+            user=user,
+            subscription__subscribers_count__gte=(
+                recipe_constants.FEED_FANOUT_MAX_SUBSCRIBERS
+            )
+        ).values_list('subscription', flat=True))
+
+    def count_for(self, user):
+        authors = self.get_pulled_authors(user)
+        return self.filter(user=user).exclude(
+            author__in=authors
+        ).count() + Recipe.objects.filter(author__in=authors).count()
+
+    def get_page(self, user, limit, before=None):
+        authors = self.get_pulled_authors(user)
+        entries = self.filter(user=user).order_by(
+            '-created_at', '-recipe'
+        ).values_list('created_at', 'recipe')
+        recipes = Recipe.objects.filter(author__in=authors).order_by(
+            '-created_at', '-id'
+        ).values_list('created_at', 'id')
+        if before is not None:
+            created_at, recipe_id = before
+            entries = entries.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, recipe__lt=recipe_id)
+            )
+            recipes = recipes.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, id__lt=recipe_id)
+            )
+        if not authors:
+            return list(entries[:limit])
+        return list(islice(heapq.merge(
+            entries.exclude(author__in=authors)[:limit],
+            recipes[:limit],
+            reverse=True
+        ), limit))
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Подписчик'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Рецепт'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор рецепта'
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Дата публикации'
+    )
+
+    objects = FeedEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique_feedentry_user_recipe'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-created_at', '-recipe'],
+                name='feedentry_user_created_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} - {self.recipe_id}'
+
+
+class TrendingRecipe(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Рецепт'
+    )
+    rank = models.PositiveIntegerField(
+        unique=True,
+        verbose_name='Место'
+    )
+    score = models.FloatField(
+        verbose_name='Рейтинг'
+    )
+
+    class Meta:
+        verbose_name = 'Популярный рецепт'
+        verbose_name_plural = 'Популярные рецепты'
+        ordering = ('rank',)
+
+    def __str__(self):
+        return f'{self.rank}. {self.recipe_id}'
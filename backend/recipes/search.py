@@ -0,0 +1,94 @@
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+from core.cache import CacheVersion
+from core.constants import RecipesConstants
+
+
+recipe_constants = RecipesConstants()
+
+WEIGHTS = {'name': 1.0, 'ingredients': 0.4, 'text': 0.2}
+
+_index = None
+_index_lock = threading.Lock()
+_version = CacheVersion('recipes:search:version')
+
+
+def get_words(value):
+    return re.findall(r'\w+', value.lower().replace('ё', 'е'))
+
+
+def get_stem(word):
+    if len(word) > recipe_constants.SEARCH_STEM_MIN_LENGTH:
+        return word[:-2]
+    return word
+
+
+class RecipeSearchIndex:
+
+    def __init__(self, recipes, ingredients):
+        postings = defaultdict(dict)
+        documents = defaultdict(lambda: defaultdict(list))
+        for recipe_id, name, text in recipes:
+            documents[recipe_id]['name'].append(name)
+            documents[recipe_id]['text'].append(text)
+        for recipe_id, ingredient_name in ingredients:
+            documents[recipe_id]['ingredients'].append(ingredient_name)
+        for recipe_id, fields in documents.items():
+            for field, values in fields.items():
+                for word in get_words(' '.join(values)):
+                    weights = postings[word]
+                    weights[recipe_id] = max(
+                        weights.get(recipe_id, 0), WEIGHTS[field]
+                    )
+        self.words = sorted(postings)
+        self.postings = [postings[word] for word in self.words]
+
+    def match(self, stem):
+        start = bisect.bisect_left(self.words, stem)
+        end = bisect.bisect_right(self.words, stem + '\uffff')
+        scores = {}
+        for position in range(start, end):
+            for recipe_id, weight in self.postings[position].items():
+                scores[recipe_id] = max(scores.get(recipe_id, 0), weight)
+        return scores
+
+    def search(self, query, limit=None):
+        scores = None
+        for stem in {get_stem(word) for word in get_words(query)}:
+            matches = self.match(stem)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {
+                    recipe_id: score + matches[recipe_id]
+                    for recipe_id, score in scores.items()
+                    if recipe_id in matches
+                }
+        if not scores:
+            return []
+        return sorted(
+            scores, key=lambda recipe_id: (-scores[recipe_id], -recipe_id)
+        )[:limit]
+
+
+def get_index(recipes, ingredients):
+    global _index
+    version = _version.get()
+    with _index_lock:
+        if _index is None or _index[0] != version:
+            _index = (version, RecipeSearchIndex(
+                recipes.values_list('id', 'name', 'text').iterator(),
+                ingredients.values_list(
+                    'recipe_id', 'ingredient__name'
+                ).iterator()
+            ))
+        return _index[1]
+
+
+def reset_index():
+    transaction.on_commit(_version.bump)
@@ -0,0 +1,120 @@
+import atexit
+import logging
+import secrets
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+
+from core.cache import CacheVersion
+from core.constants import CacheConstants, RecipesConstants
+
+
+logger = logging.getLogger(__name__)
+
+cache_constants = CacheConstants()
+recipe_constants = RecipesConstants()
+
+
+def generate_code():
+    return ''.join(
+        secrets.choice(recipe_constants.SHORT_LINK_ALPHABET)
+        for _ in range(recipe_constants.SHORT_LINK_CODE_LENGTH)
+    )
+
+
+class ShortLinkResolver:
+
+    def __init__(self):
+        self.version = CacheVersion('shortlinks:version')
+        self.local = OrderedDict()
+        self.local_version = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_cache_key(code):
+        return f'shortlinks:{code}'
+
+    def resolve(self, code):
+        version = self.version.get()
+        with self.lock:
+            if self.local_version != version:
+                self.local.clear()
+                self.local_version = version
+            recipe_id = self.local.get(code)
+            if recipe_id is not None:
+                self.local.move_to_end(code)
+                return recipe_id
+        recipe_id = cache.get(self.get_cache_key(code))
+        if recipe_id is None:
+            from .models import ShortLink
+
+            recipe_id = ShortLink.objects.filter(code=code).values_list(
+                'recipe_id', flat=True
+            ).first()
+            if recipe_id is None:
+                return None
+            cache.set(
+                self.get_cache_key(code),
+                recipe_id,
+                cache_constants.SHORT_LINK_CACHE_TIMEOUT
+            )
+        with self.lock:
+            if self.local_version == version:
+                self.local[code] = recipe_id
+                while len(self.local) > cache_constants.SHORT_LINK_LOCAL_SIZE:
+                    self.local.popitem(last=False)
+        return recipe_id
+
+    def invalidate(self, code):
+        cache.delete(self.get_cache_key(code))
+        self.version.bump()
+        with self.lock:
+            self.local.clear()
+
+
+class HitCounter:
+
+    def __init__(self):
+        self.pending = Counter()
+        self.flushed_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add(self, code):
+        with self.lock:
+            self.pending[code] += 1
+            due = (
+                sum(self.pending.values())
+                >= cache_constants.SHORT_LINK_FLUSH_SIZE
+                or time.monotonic() - self.flushed_at
+                >= cache_constants.SHORT_LINK_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.flushed_at = time.monotonic()
+        if not pending:
+            return
+        from .models import ShortLink
+
+        try:
+            ShortLink.objects.filter(code__in=pending).update(
+                hits=F('hits') + Case(
+                    *(When(code=code, then=Value(count))
+                      for code, count in pending.items()),
+                    output_field=IntegerField()
+                )
+            )
+        except Exception:
+            logger.exception('Не удалось сохранить переходы по ссылкам')
+
+
+resolver = ShortLinkResolver()
+hit_counter = HitCounter()
+
+atexit.register(hit_counter.flush)
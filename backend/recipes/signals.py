@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .autocomplete import reset_index
+from .models import (Favorite, Ingredient, Recipe, ShoppingCart,
+                     ShoppingListItem, ShortLink, Subscription, Tag)
+from .search import reset_index as reset_search_index
+from .shortlinks import resolver
+from core.cache import (get_profile_version, get_relations_version,
+                        ingredient_catalogue, recipes_version, tag_catalogue)
+from core.images import schedule_image_processing
+from core.purge import purge_proxy_cache
+
+
+User = get_user_model()
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def reset_ingredient_caches(instance, **kwargs):
+    reset_index()
+    reset_search_index()
+    transaction.on_commit(ingredient_catalogue.invalidate)
+    purge_proxy_cache(
+        '/api/ingredients/', f'/api/ingredients/{instance.pk}/'
+    )
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def reset_tag_caches(instance, **kwargs):
+    transaction.on_commit(tag_catalogue.invalidate)
+    purge_proxy_cache(
+        '/api/tags/', f'/api/tags/{instance.pk}/', '/api/recipes/'
+    )
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def purge_recipe_cache(instance, **kwargs):
+    reset_search_index()
+    transaction.on_commit(recipes_version.bump)
+    purge_proxy_cache('/api/recipes/', f'/api/recipes/{instance.pk}/')
+
+
+@receiver(post_save, sender=Recipe)
+def count_created_recipe(instance, created, **kwargs):
+    if created:
+        User.objects.filter(pk=instance.author_id).update(
+            recipes_count=F('recipes_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def count_deleted_recipe(instance, **kwargs):
+    User.objects.filter(
+        pk=instance.author_id, recipes_count__gt=0
+    ).update(recipes_count=F('recipes_count') - 1)
+
+
+@receiver(pre_delete, sender=Recipe)
+def remove_from_shopping_lists(instance, **kwargs):
+    user_ids = list(instance.shoppingcarts.values_list('user_id', flat=True))
+    if user_ids:
+        ShoppingListItem.objects.remove_recipe(user_ids, instance)
+
+
+@receiver(pre_delete, sender=User)
+def forget_user_relations(instance, **kwargs):
+    for model in (Favorite, ShoppingCart, Subscription):
+        model.objects.forget_user(instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def process_recipe_image(instance, update_fields=None, **kwargs):
+    if update_fields is None or 'image' in update_fields:
+        schedule_image_processing(
+            instance.image,
+            recipes_version, get_profile_version(instance.author_id)
+        )
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+@receiver((post_save, post_delete), sender=ShoppingCart)
+@receiver((post_save, post_delete), sender=Subscription)
+def bump_relations_version(instance, **kwargs):
+    get_relations_version(instance.user_id).bump()
+
+
+@receiver(post_delete, sender=ShortLink)
+def forget_short_link(instance, **kwargs):
+    resolver.invalidate(instance.code)
@@ -0,0 +1,45 @@
+import threading
+
+from django.core.cache import cache
+
+from core.cache import tag_catalogue
+from core.constants import CacheConstants
+
+
+cache_constants = CacheConstants()
+
+
+class TagSlugMap:
+
+    def __init__(self):
+        self.local = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        version = tag_catalogue.get_version()
+        with self.lock:
+            if self.local is not None and self.local[0] == version:
+                return self.local[1]
+        cache_key = f'catalogue:tags:{version}:slugs'
+        slugs = cache.get(cache_key)
+        if slugs is None:
+            from .models import Tag
+
+            slugs = dict(Tag.objects.values_list('slug', 'id'))
+            cache.set(
+                cache_key, slugs, cache_constants.CATALOGUE_CACHE_TIMEOUT
+            )
+        with self.lock:
+            self.local = (version, slugs)
+        return slugs
+
+    def get_ids(self, slugs):
+        tag_ids = self.get()
+        return [tag_ids[slug] for slug in slugs if slug in tag_ids]
+
+
+tag_slugs = TagSlugMap()
+
+
+def get_tag_choices():
+    return [(slug, slug) for slug in tag_slugs.get()]
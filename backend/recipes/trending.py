@@ -0,0 +1,37 @@
+import threading
+
+from core.cache import CacheVersion
+from core.constants import RecipesConstants
+
+
+recipe_constants = RecipesConstants()
+
+
+class TrendingCache:
+
+    def __init__(self):
+        self.version = CacheVersion('recipes:trending:version')
+        self.local = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        version = self.version.get()
+        with self.lock:
+            if self.local is not None and self.local[0] == version:
+                return self.local[1]
+        from .models import TrendingRecipe
+
+        recipe_ids = list(TrendingRecipe.objects.values_list(
+            'recipe_id', flat=True
+        )[:recipe_constants.TRENDING_TOP_SIZE])
+        with self.lock:
+            self.local = (version, recipe_ids)
+        return recipe_ids
+
+    def invalidate(self):
+        self.version.bump()
+        with self.lock:
+            self.local = None
+
+
+trending_cache = TrendingCache()
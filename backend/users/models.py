@@ -3,12 +3,13 @@ from django.core.validators import RegexValidator
 from django.db import models
 
 from core.constants import UsersConstants
+from core.models import CounterFieldsMixin
 
 
 user_constants = UsersConstants()
 
 
-class CustomUser(AbstractUser):
+class CustomUser(CounterFieldsMixin, AbstractUser):
     first_name = models.CharField(
         max_length=user_constants.CUSTOMUSER_FIRST_NAME_LENGTH,
         verbose_name='Имя'
@@ -43,6 +44,18 @@ class CustomUser(AbstractUser):
         default=None,
         verbose_name='Аватар'
     )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Рецептов'
+    )
+    subscribers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Подписчиков'
+    )
+
+    counter_fields = ('recipes_count', 'subscribers_count')
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = (
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.authentication import token_cache
+from core.cache import get_profile_version, recipes_version
+from core.images import schedule_image_processing
+
+
+User = get_user_model()
+
+IGNORED_USER_FIELDS = {'last_login'}
+
+
+@receiver(post_save, sender=User)
+def process_avatar(instance, update_fields=None, **kwargs):
+    if update_fields is None or 'avatar' in update_fields:
+        schedule_image_processing(
+            instance.avatar, get_profile_version(instance.pk), recipes_version
+        )
+
+
+@receiver((post_save, post_delete), sender=User)
+def invalidate_user_caches(instance, update_fields=None, **kwargs):
+    if update_fields is None or set(update_fields) - IGNORED_USER_FIELDS:
+        token_cache.invalidate(instance.pk)
+        transaction.on_commit(get_profile_version(instance.pk).bump)
+        if instance.recipes.exists():
+            transaction.on_commit(recipes_version.bump)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token(instance, **kwargs):
+    token_cache.invalidate(instance.user_id)